@@ -1,19 +1,25 @@
 import sys
 import os
+import contextlib
 import signal
 import platform
+import psutil
 from pathlib import Path
 from dotenv import load_dotenv
 from telegram.error import Conflict, NetworkError, TimedOut
 import logging
-import time
-from telegram.ext import ApplicationBuilder, Application, PicklePersistence
-from fitness_coach_bot.config import TOKEN, COMMANDS
-from fitness_coach_bot.database import Database
-from fitness_coach_bot.workout_manager import WorkoutManager
-from fitness_coach_bot.reminder import ReminderManager
-from fitness_coach_bot.handlers import BotHandlers
-from fitness_coach_bot.payment_webhook import start_webhook_server
+from typing import TYPE_CHECKING
+from telegram.error import TelegramError
+from telegram.request import HTTPXRequest
+from fitness_coach_bot.config import TOKEN, COMMAND_LIST, COMMANDS_HASH
+
+if TYPE_CHECKING:
+    from telegram.ext import Application
+
+try:
+    import orjson
+except ImportError:  # Fall back to PTB's stdlib json parsing
+    orjson = None
 
 # Check platform
 IS_WINDOWS = platform.system() == 'Windows'
@@ -28,6 +34,11 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+# The format above doesn't use thread/process fields, so skip collecting them
+logging.logThreads = False
+logging.logProcesses = False
+logging.raiseExceptions = False
+
 logger = logging.getLogger(__name__)
 
 def load_environment():
@@ -40,7 +51,7 @@ def load_environment():
     
     for env_path in env_paths:
         if os.path.exists(env_path):
-            logger.info(f"Loading environment from: {env_path}")
+            logger.info("Loading environment from: %s", env_path)
             load_dotenv(env_path)
             return True
     
@@ -57,14 +68,25 @@ else:
 
 application = None  # Global application instance
 
+# Paths resolved once at import time
+BASE_DIR = Path(__file__).resolve().parent
+PERSISTENCE_PATH = BASE_DIR / 'bot_persistence'
+
 # Use platform-specific temp directory for pid files
 if IS_WINDOWS:
-    temp_dir = os.environ.get('TEMP', os.path.join(os.environ.get('USERPROFILE', 'C:'), 'Temp'))
+    TEMP_DIR = Path(os.environ.get('TEMP') or Path(os.environ.get('USERPROFILE', 'C:')) / 'Temp')
 else:
-    temp_dir = '/tmp'
+    TEMP_DIR = Path('/tmp')
 
-PID_FILE = os.path.join(temp_dir, 'telegram_bot.pid')
-LOCK_FILE = os.path.join(temp_dir, 'telegram_bot.lock')
+PID_FILE = TEMP_DIR / 'telegram_bot.pid'
+LOCK_FILE = TEMP_DIR / 'telegram_bot.lock'
+
+def is_bot_process(pid):
+    """Check that a PID belongs to a live process running the same executable as us"""
+    try:
+        return psutil.pid_exists(pid) and psutil.Process(pid).name() == psutil.Process().name()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
 
 # Add context manager for lock file
 class LockManager:
@@ -83,13 +105,8 @@ class LockManager:
                         with open(self.lock_file, 'r') as f:
                             pid = int(f.read().strip())
                         
-                        # Try to check if process exists (Windows approach)
-                        import ctypes
-                        kernel32 = ctypes.windll.kernel32
-                        handle = kernel32.OpenProcess(1, 0, pid)
-                        if handle:
-                            kernel32.CloseHandle(handle)
-                            logger.error(f"Process with PID {pid} still running")
+                        if is_bot_process(pid):
+                            logger.error("Process with PID %s still running", pid)
                             return None
                     except (IOError, ValueError, OSError):
                         # If we can't read the PID or the process doesn't exist
@@ -101,121 +118,56 @@ class LockManager:
                 self.locked = True
                 return True
             except Exception as e:
-                logger.error(f"Windows lock error: {e}")
+                logger.error("Windows lock error: %s", e)
                 return None
         else:
-            # Unix implementation using fcntl
+            # Unix implementation using fcntl; O_CLOEXEC keeps child processes
+            # from inheriting (and accidentally holding) the lock
             try:
-                self.lock_fd = os.open(self.lock_file, os.O_CREAT | os.O_RDWR)
-                fcntl.flock(self.lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self.lock_fd = os.open(self.lock_file, os.O_CREAT | os.O_RDWR | os.O_CLOEXEC, 0o644)
+                fcntl.lockf(self.lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                os.ftruncate(self.lock_fd, 0)
+                os.write(self.lock_fd, f"{os.getpid()}\n".encode())
                 return self.lock_fd
             except (IOError, OSError) as e:
-                logger.error(f"Could not acquire lock: {e}")
-                if self.lock_fd:
+                logger.error("Could not acquire lock: %s", e)
+                if self.lock_fd is not None:
                     os.close(self.lock_fd)
+                    self.lock_fd = None
                 return None
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if IS_WINDOWS:
             if self.locked:
-                try:
-                    if os.path.exists(self.lock_file):
-                        os.remove(self.lock_file)
-                except (IOError, OSError) as e:
-                    logger.error(f"Error releasing Windows lock: {e}")
+                with contextlib.suppress(FileNotFoundError, PermissionError):
+                    os.unlink(self.lock_file)
         else:
             if self.lock_fd is not None:
                 try:
-                    fcntl.flock(self.lock_fd, fcntl.LOCK_UN)
+                    # Truncate instead of unlinking so a concurrent starter
+                    # never locks a file that is about to disappear
+                    os.ftruncate(self.lock_fd, 0)
+                    fcntl.lockf(self.lock_fd, fcntl.LOCK_UN)
                     os.close(self.lock_fd)
-                    os.unlink(self.lock_file)
                 except (IOError, OSError) as e:
-                    logger.error(f"Error releasing lock: {e}")
-
-def acquire_lock():
-    """Try to acquire the lock file"""
-    if IS_WINDOWS:
-        try:
-            # Windows implementation
-            if os.path.exists(LOCK_FILE):
-                return None
-            with open(LOCK_FILE, 'w') as f:
-                f.write(str(os.getpid()))
-            return True
-        except (IOError, OSError) as e:
-            logger.error(f"Could not acquire Windows lock: {e}")
-            return None
-    else:
-        # Unix implementation
-        try:
-            lock_fd = os.open(LOCK_FILE, os.O_CREAT | os.O_RDWR)
-            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-            return lock_fd
-        except (IOError, OSError) as e:
-            logger.error(f"Could not acquire lock: {e}")
-            return None
-
-def release_lock(lock_fd):
-    """Release the lock file"""
-    if IS_WINDOWS:
-        if os.path.exists(LOCK_FILE):
-            try:
-                os.remove(LOCK_FILE)
-            except (IOError, OSError) as e:
-                logger.error(f"Error releasing Windows lock: {e}")
-    else:
-        if lock_fd is not None:
-            try:
-                fcntl.flock(lock_fd, fcntl.LOCK_UN)
-                os.close(lock_fd)
-                os.unlink(LOCK_FILE)
-            except (IOError, OSError) as e:
-                logger.error(f"Error releasing lock: {e}")
-
-def signal_handler(signum, frame):
-    """Handle shutdown signals"""
-    logger.info(f"Received shutdown signal {signum}, cleaning up...")
-    if application:
-        try:
-            # Properly handle async stop
-            import asyncio
-            try:
-                # Get or create event loop
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                    # Run the coroutine to stop the application
-                    loop.run_until_complete(application.stop())
-                except Exception:
-                    # Fallback
-                    asyncio.run(application.stop())
-            except Exception as e:
-                logger.error(f"Error in async handling: {e}")
-            logger.info("Application stopped successfully")
-        except Exception as e:
-            logger.error(f"Error stopping application: {e}")
+                    logger.error("Error releasing lock: %s", e)
+                finally:
+                    self.lock_fd = None
 
+async def shutdown_cleanup(application: "Application") -> None:
+    """Remove the PID file once the application has shut down"""
     cleanup_files()
-    logger.info("Cleanup completed, exiting...")
-    sys.exit(0)
+    logger.info("Cleanup completed")
 
 def cleanup_files():
-    """Clean up PID and lock files"""
-    try:
-        if os.path.exists(PID_FILE):
-            os.remove(PID_FILE)
-            logger.info("Removed PID file")
-    except Exception as e:
-        logger.error(f"Error removing PID file: {e}")
+    """Clean up the PID file.
 
-    try:
-        if os.path.exists(LOCK_FILE):
-            os.remove(LOCK_FILE)
-            logger.info("Removed lock file")
-    except Exception as e:
-        logger.error(f"Error removing lock file: {e}")
+    The lock file stays: LockManager truncates it on release, and unlinking it
+    would let a concurrent starter lock a file that is about to disappear.
+    """
+    with contextlib.suppress(FileNotFoundError, PermissionError):
+        os.unlink(PID_FILE)
+        logger.info("Removed PID file")
 
 def cleanup_old_instances():
     """Attempt to clean up any existing bot instances"""
@@ -232,83 +184,68 @@ def cleanup_old_instances():
                     with open(PID_FILE, 'r') as f:
                         old_pid = int(f.read().strip())
                     
-                    # Platform-specific process checking
-                    if IS_WINDOWS:
+                    if is_bot_process(old_pid):
                         try:
-                            # Windows approach to check if process exists
-                            import ctypes
-                            kernel32 = ctypes.windll.kernel32
-                            handle = kernel32.OpenProcess(1, 0, old_pid)
-                            process_exists = handle != 0
-                            if handle:
-                                kernel32.CloseHandle(handle)
-                                
-                            if process_exists:
-                                # Windows approach to terminate process
-                                logger.info(f"Found running instance with PID {old_pid}")
-                                os.system(f"taskkill /PID {old_pid} /F")
-                                logger.info(f"Sent termination signal to old instance with PID {old_pid}")
+                            old_process = psutil.Process(old_pid)
+                            logger.info("Found running instance with PID %s", old_pid)
+                            old_process.terminate()
+                            logger.info("Sent termination signal to old instance with PID %s", old_pid)
+                            # Wait up to 5 seconds, then force kill
+                            try:
+                                old_process.wait(timeout=5)
+                                logger.info("Old instance terminated successfully")
+                            except psutil.TimeoutExpired:
+                                old_process.kill()
+                                logger.info("Force killed old instance with PID %s", old_pid)
+                        except psutil.NoSuchProcess:
+                            logger.info("Old instance with PID %s already exited", old_pid)
                         except Exception as e:
-                            logger.error(f"Error checking/killing Windows process: {e}")
+                            logger.error("Error killing old process: %s", e)
                     else:
-                        # Unix approach
-                        try:
-                            # Check if process exists
-                            os.kill(old_pid, 0)
-                            # If we get here, process exists
-                            logger.info(f"Found running instance with PID {old_pid}")
-                            os.kill(old_pid, signal.SIGTERM)
-                            logger.info(f"Sent SIGTERM to old instance with PID {old_pid}")
-                            # Wait for process to terminate
-                            for _ in range(5):  # Wait up to 5 seconds
-                                time.sleep(1)
-                                try:
-                                    os.kill(old_pid, 0)
-                                except ProcessLookupError:
-                                    logger.info("Old instance terminated successfully")
-                                    break
-                            else:
-                                # If process still exists after timeout, force kill
-                                try:
-                                    os.kill(old_pid, signal.SIGKILL)
-                                    logger.info(f"Force killed old instance with PID {old_pid}")
-                                except ProcessLookupError:
-                                    pass
-                        except ProcessLookupError:
-                            logger.info(f"No process found with PID {old_pid}")
-                        except Exception as e:
-                            logger.error(f"Error killing old process: {e}")
+                        logger.info("No process found with PID %s", old_pid)
                 except Exception as e:
-                    logger.error(f"Error reading PID file: {e}")
-
-            # Remove old files
-            cleanup_files()
+                    logger.error("Error reading PID file: %s", e)
 
-            # Save current PID
+            # Save current PID (overwrites the old one)
             with open(PID_FILE, 'w') as f:
                 f.write(str(os.getpid()))
-            logger.info(f"Saved current PID {os.getpid()} to file")
+            logger.info("Saved current PID %s to file", os.getpid())
 
             return True
 
     except Exception as e:
-        logger.error(f"Error in cleanup: {e}")
+        logger.error("Error in cleanup: %s", e)
         cleanup_files()
         return False
 
-async def setup_commands(application: Application) -> None:
+class OrjsonRequest(HTTPXRequest):
+    """HTTPX request that parses Telegram responses with orjson when available"""
+
+    @staticmethod
+    def parse_json_payload(payload: bytes) -> dict:
+        if orjson is None:
+            return HTTPXRequest.parse_json_payload(payload)
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError as exc:
+            logger.error("Can not load invalid JSON data: %r", payload)
+            raise TelegramError("Invalid server response") from exc
+
+async def setup_commands(application: "Application") -> None:
     """Set up bot commands."""
+    if application.bot_data.get("_cmd_hash") == COMMANDS_HASH:
+        logger.info("Bot commands unchanged, skipping registration")
+        return
     try:
-        await application.bot.set_my_commands([
-            (command, description) for command, description in COMMANDS.items()
-        ])
+        await application.bot.set_my_commands(COMMAND_LIST)
+        application.bot_data["_cmd_hash"] = COMMANDS_HASH
         logger.info("Bot commands set up successfully")
     except Exception as e:
-        logger.error(f"Error setting up commands: {e}")
+        logger.error("Error setting up commands: %s", e)
 
 async def error_handler(update, context):
     """Handle bot errors"""
-    logger.error(f"Update {update} caused error {context.error}")
+    logger.error("Update %s caused error %s", update, context.error)
 
     if isinstance(context.error, Conflict):
         logger.warning("Conflict error detected, attempting cleanup...")
@@ -321,6 +258,15 @@ async def error_handler(update, context):
 def main():
     """Main function to start the bot"""
     global application
+
+    # Heavy imports are deferred so importing this module stays cheap
+    from concurrent.futures import ThreadPoolExecutor
+    from telegram.ext import AIORateLimiter, ApplicationBuilder, PicklePersistence
+    from fitness_coach_bot.database import Database
+    from fitness_coach_bot.workout_manager import WorkoutManager
+    from fitness_coach_bot.reminder import ReminderManager
+    from fitness_coach_bot.handlers import BotHandlers
+    from fitness_coach_bot.payment_webhook import start_webhook_server
     
     try:        
         # Ensure we have a valid token
@@ -330,30 +276,56 @@ def main():
             
         logger.info("Starting bot...")
         
-        # Clean up old instances
-        cleanup_old_instances()
-        
-        # Write PID file
-        with open(PID_FILE, 'w') as f:
-            f.write(str(os.getpid()))
-            
-        # Setup signal handlers
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        # Clean up old instances; this also records our PID while holding the lock
+        if not cleanup_old_instances():
+            return False
             
-        # Initialize bot services
-        database = Database()
+        webhook_port = int(os.getenv('WEBHOOK_PORT', 5000))
+        public_webhook_url = os.getenv('PUBLIC_WEBHOOK_URL')
+
+        # Database, persistence and the payment webhook server are independent,
+        # so initialize them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            database_future = executor.submit(Database)
+            persistence_future = executor.submit(
+                PicklePersistence,
+                filepath=PERSISTENCE_PATH,
+                update_interval=300,
+                on_flush=False,
+            )
+            if public_webhook_url:
+                # Start payment webhook server if environment variables are configured
+                logger.info("Starting YooMoney payment webhook server on port %s", webhook_port)
+                webhook_future = executor.submit(start_webhook_server, port=webhook_port, public_url=public_webhook_url)
+            else:
+                webhook_future = None
+                logger.warning("PUBLIC_WEBHOOK_URL not set, YooMoney payment webhook server not started")
+
+            database = database_future.result()
+            persistence = persistence_future.result()
+            if webhook_future is not None:
+                webhook_future.result()
+                logger.info("YooMoney payment webhook registered at %s/webhook/payment", public_webhook_url)
+
+        # Initialize bot services that depend on the database
         workout_manager = WorkoutManager(database)
         reminder_manager = ReminderManager(database)
         
-        # Set up persistence
-        persistence_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bot_persistence')
-        persistence = PicklePersistence(filepath=persistence_path)
-        
         # Initialize application with persistent data
         application_builder = ApplicationBuilder()
         application_builder.token(TOKEN)
         application_builder.persistence(persistence)
+        application_builder.request(OrjsonRequest(connection_pool_size=64, http_version="2"))
+        application_builder.get_updates_request(OrjsonRequest(http_version="2"))
+        # Queue outgoing calls under Telegram's flood limits (30 msg/s overall,
+        # 20 msg/min per group) and retry 429s after their retry_after
+        application_builder.rate_limiter(AIORateLimiter(
+            overall_max_rate=28,
+            overall_time_period=1,
+            group_max_rate=18,
+            group_time_period=60,
+            max_retries=3,
+        ))
         application = application_builder.build()
         
         # Set up error handler
@@ -361,27 +333,19 @@ def main():
         
         # Register commands with BotFather
         application.post_init = setup_commands
+
+        # Remove the PID file after a graceful stop
+        application.post_shutdown = shutdown_cleanup
         
         # Initialize handlers
         handlers = BotHandlers(database, workout_manager, reminder_manager)
 
-        # Start payment webhook server if environment variables are configured
-        webhook_port = int(os.getenv('WEBHOOK_PORT', 5000))
-        public_webhook_url = os.getenv('PUBLIC_WEBHOOK_URL')
-        
-        if public_webhook_url:
-            logger.info(f"Starting YooMoney payment webhook server on port {webhook_port}")
-            start_webhook_server(port=webhook_port, public_url=public_webhook_url)
-            logger.info(f"YooMoney payment webhook registered at {public_webhook_url}/webhook/payment")
-        else:
-            logger.warning("PUBLIC_WEBHOOK_URL not set, YooMoney payment webhook server not started")
-        
-        # Start the bot
-        application.run_polling()
+        # Start the bot; PTB stops the loop gracefully on these signals
+        application.run_polling(stop_signals=(signal.SIGINT, signal.SIGTERM))
         return True
         
     except Exception as e:
-        logger.error(f"Error in main function: {e}", exc_info=True)
+        logger.error("Error in main function: %s", e, exc_info=True)
         cleanup_files()
         return False
 
@@ -1,10 +1,35 @@
 #!/usr/bin/env python3
 import os
 import sys
+import time
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from pathlib import Path
 
+# Shared session so repeated checks reuse the same TLS connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+# getMe responses cached per token hash: {hash: (fetched_at, bot_info)}
+_GETME_CACHE = {}
+_GETME_TTL = 60
+
+def get_me(token):
+    """Return the getMe response for a token, cached for a short time"""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    cached = _GETME_CACHE.get(key)
+    if cached and time.monotonic() - cached[0] < _GETME_TTL:
+        return cached[1]
+
+    url = f"https://api.telegram.org/bot{token}/getMe"
+    response = _SESSION.get(url, timeout=5)
+    response.raise_for_status()
+    bot_info = response.json()
+    _GETME_CACHE[key] = (time.monotonic(), bot_info)
+    return bot_info
+
 def main():
     """
     Check if the test bot is running by making a getMe request to the Telegram API
@@ -25,12 +50,8 @@ def main():
         sys.exit(1)
     
     # Make a getMe request to check if the bot is responsive
-    url = f"https://api.telegram.org/bot{test_token}/getMe"
-    
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        bot_info = response.json()
+        bot_info = get_me(test_token)
         
         if bot_info.get('ok'):
             bot_data = bot_info.get('result', {})
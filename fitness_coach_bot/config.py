@@ -1,5 +1,7 @@
 # Bot configuration and constants
 import os
+import hashlib
+from telegram import BotCommand
 
 # Telegram Bot Token
 TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
@@ -32,6 +34,12 @@ COMMANDS = {
     'premium': 'Управление премиум-доступом (только для админов)',
 }
 
+# Command list ready for set_my_commands, built once at import
+COMMAND_LIST = tuple(BotCommand(command, description) for command, description in COMMANDS.items())
+
+# Fingerprint of the command list, used to skip re-registering unchanged commands
+COMMANDS_HASH = hashlib.blake2b(repr(sorted(COMMANDS.items())).encode(), digest_size=8).hexdigest()
+
 SUBSCRIPTION_MESSAGE = """
 В твою подписку входит:
 
@@ -1,19 +1,459 @@
 import json
-from datetime import datetime, timedelta
-import json
-from collections import defaultdict
+from datetime import date, datetime, timedelta
 import logging
+import math
 import os
 import time
+import atexit
+import heapq
+import itertools
+import threading
+import queue
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import boto3
+from botocore.config import Config
+import numpy as np
 from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import TypeSerializer
+from sortedcontainers import SortedList
+from cachetools import TTLCache
 import decimal
+import functools
 from decimal import Decimal
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Only needed for FCB_FILE_FORMAT=msgpack
+    msgpack = None
+
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# File storage: mutations are appended to "<file>.log" and folded into the
+# JSON snapshot once this many records have accumulated
+WAL_COMPACT_EVERY = 500
+# fdatasync the log every N appended records
+WAL_FSYNC_EVERY = 20
+WAL_BUFFER_SIZE = 1024 * 1024
+# Per-process user cache bounds; the TTL caps staleness when another process
+# (or the admin tools) writes the same records
+USER_CACHE_SIZE = 10_000
+USER_CACHE_TTL = 30
+# Optional feedback-table GSI keyed by user_id (hash) and numeric timestamp
+# (range); when set, recent-feedback reads fetch only the newest items
+FEEDBACK_TIME_INDEX = os.getenv('DYNAMO_FEEDBACK_TIME_INDEX')
+# File storage: newest feedback entries kept per user for get_recent_feedback
+RECENT_FEEDBACK_SIZE = 50
+# migrate_data_to_dynamo: items per batch_writer job and concurrent jobs
+MIGRATE_CHUNK_SIZE = 500
+MIGRATE_WORKERS = 16
+# Pretty-print snapshots only when debugging; compact output is half the size
+DB_DEBUG = bool(os.getenv('DB_DEBUG'))
+# Snapshot encoding for file storage: 'json' (default) or 'msgpack'. Append
+# logs stay JSON lines either way.
+FILE_FORMAT = os.getenv('FCB_FILE_FORMAT', 'json').lower()
+if FILE_FORMAT == 'msgpack' and msgpack is None:
+    logger.warning("FCB_FILE_FORMAT=msgpack but msgpack is not installed, using JSON")
+    FILE_FORMAT = 'json'
+
+
+def _json_default(obj):
+    """Encode values the JSON encoders don't handle natively (DynamoDB Decimals, sets)"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return str(obj)
+
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _json_dumps(data, indent=False):
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        option = _ORJSON_OPTS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_json_default, option=option)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+def _json_line(record):
+    """Serialize one append-log record as a newline-terminated JSON line"""
+    if orjson is not None:
+        return orjson.dumps(record, default=_json_default, option=_ORJSON_OPTS | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(record, ensure_ascii=False, default=_json_default).encode('utf-8') + b"\n"
+
+
+# fdatasync skips the metadata flush; not every platform has it
+_datasync = getattr(os, 'fdatasync', os.fsync)
+# os.writev is POSIX-only; batches longer than IOV_MAX fall back to one joined write
+_writev = getattr(os, 'writev', None)
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 16
+
+try:
+    import fcntl
+except ImportError:  # Windows: log appends are only serialized within the process
+    fcntl = None
+
+# POSIX record locks are held per process, so instances sharing a process
+# (the bot and the payment webhook) also serialize on a lock per log path
+_log_locks = {}
+_log_locks_guard = threading.Lock()
+
+
+def _log_lock(log_path):
+    """Return the in-process lock shared by every instance writing log_path"""
+    key = os.path.realpath(log_path)
+    with _log_locks_guard:
+        lock = _log_locks.get(key)
+        if lock is None:
+            lock = _log_locks[key] = threading.Lock()
+        return lock
+
+
+def _progress_ids(entries):
+    """Return the progress_ids of the records in a progress list"""
+    return {
+        entry['progress_id'] for entry in entries
+        if isinstance(entry, dict) and entry.get('progress_id') is not None
+    }
+
+
+def _pack_snapshot(file_path, data):
+    """Encode a snapshot in the format implied by its file extension"""
+    if file_path.endswith('.mp'):
+        return msgpack.packb(data, use_bin_type=True, default=_json_default)
+    return _json_dumps(data, indent=DB_DEBUG)
+
+
+def _unpack_snapshot(file_path, payload):
+    """Decode a snapshot; malformed input raises a ValueError subclass for either format"""
+    if file_path.endswith('.mp'):
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    return _json_loads(payload)
+
+
+def _snapshot_looks_valid(file_path):
+    """Cheap check that a snapshot is non-empty and starts with a map; decoding is left to _read_json"""
+    with open(file_path, 'rb') as f:
+        head = f.read(64)
+    if file_path.endswith('.mp'):
+        # fixmap, map16 or map32
+        return bool(head) and (0x80 <= head[0] <= 0x8f or head[0] in (0xde, 0xdf))
+    return head.lstrip()[:1] == b'{'
+
+
+def _json_loads(payload):
+    """Parse JSON bytes; orjson.JSONDecodeError subclasses json.JSONDecodeError"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+# Date formats stored progress records have used over time, tried in order
+_WORKOUT_DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',  # Format with time
+    '%Y-%m-%d',           # Format without time
+    '%d-%m-%Y',           # Alternative format
+    '%Y-%m-%d %H:%M',     # Format with hours and minutes only
+)
+
+
+# Stored date strings never change, and in DynamoDB mode every read
+# returns fresh records that lack the per-record _date_obj cache
+@functools.lru_cache(maxsize=8192)
+def _parse_workout_date(date_str):
+    """Parse a stored workout date in any of the formats we have written over time"""
+    # Nearly every record is ISO 'YYYY-MM-DD[ HH:MM:SS]', which fromisoformat parses in C
+    try:
+        return datetime.fromisoformat(date_str).date()
+    except ValueError:
+        pass
+    # ISO day followed by a time the full parse rejected: the day alone decides
+    if ' ' in date_str:
+        try:
+            return date.fromisoformat(date_str.partition(' ')[0])
+        except ValueError:
+            pass
+
+    workout_date = None
+
+    # Try parsing with different formats
+    for date_format in _WORKOUT_DATE_FORMATS:
+        try:
+            if ' ' in date_str and '%H' not in date_format:
+                # Skip date-only formats for strings with time
+                continue
+            workout_date = datetime.strptime(date_str, date_format).date()
+            break  # Stop trying formats if one succeeds
+        except ValueError:
+            continue
+
+    # If all formats failed, try extracting just the date part
+    if workout_date is None and ' ' in date_str:
+        date_part = date_str.partition(' ')[0]
+        try:
+            workout_date = datetime.strptime(date_part, '%Y-%m-%d').date()
+        except ValueError:
+            pass
+
+    return workout_date
+
+
+def _timestamp_epoch(value):
+    """Return a stored timestamp as integer epoch seconds, accepting legacy '%Y-%m-%d %H:%M:%S' strings"""
+    if isinstance(value, str):
+        try:
+            return int(datetime.strptime(value, '%Y-%m-%d %H:%M:%S').timestamp())
+        except ValueError:
+            return 0
+    return int(value)
+
+
+def _expiry_epoch(expiry_date):
+    """Return a subscription's 'YYYY-MM-DD' expiry date as epoch seconds, or None if unparseable"""
+    try:
+        return int(datetime.strptime(expiry_date, '%Y-%m-%d').timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+def _period_stats(workouts, completed):
+    """Build a weekly/monthly stats entry; buckets always hold at least one workout"""
+    return {"workouts": workouts, "completed": completed, "completion_rate": int(completed / workouts * 100)}
+
+
+def _without_private(record):
+    """Drop in-memory cache fields (keys starting with '_') before persisting"""
+    return {k: v for k, v in record.items() if not k.startswith('_')}
+
+# English month names, as strftime('%B') gives under the C locale the bot runs in
+_MONTH_NAMES = (
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December',
+)
+
+# Physical feedback states in tie-break order for the predominant state
+_PHYSICAL_STATE_PRIORITY = ('ok', 'too_easy', 'tired')
+
+# Item fields that DynamoDB keys/indexes expect as strings
+_DYNAMO_STR_FIELDS = frozenset({'user_id', 'progress_id', 'workout_id', 'feedback_id'})
+# Feedback state fields and the value stored when they are missing
+_DYNAMO_STATE_DEFAULTS = {'emotional_state': 'neutral', 'physical_state': 'ok'}
+# Boolean-like fields stored as 0/1 numbers
+_DYNAMO_BOOL_FIELDS = frozenset({'workout_completed', 'premium', 'is_completed', 'active', 'is_active'})
+_DYNAMO_TRUE = Decimal('1')
+_DYNAMO_FALSE = Decimal('0')
+
+
+def _dynamo_flag(key, value):
+    """Convert a boolean-like field value to a 0/1 Decimal"""
+    if isinstance(value, bool):
+        return _DYNAMO_TRUE if value else _DYNAMO_FALSE
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return _DYNAMO_TRUE if value.lower() == 'true' else _DYNAMO_FALSE
+    if value in (0, 1):
+        return Decimal(str(value))
+    logger.warning("Unexpected value for boolean field %s: %s, converting based on truthiness", key, value)
+    return _DYNAMO_TRUE if value else _DYNAMO_FALSE
+
+
+def _dynamo_state(key):
+    """Build the converter for a feedback state field, substituting its default for None"""
+    default = _DYNAMO_STATE_DEFAULTS[key]
+    return lambda value: default if value is None else str(value)
+
+
+def _dynamo_fields(field_converters):
+    """Build a dict converter that applies per-field converters and sends other keys through _to_dynamo"""
+    converter_for = field_converters.get
+
+    def convert(data):
+        result = {}
+        for k, v in data.items():
+            try:
+                result[k] = converter_for(k, _to_dynamo)(v)
+            except Exception as e:
+                logger.warning("Error converting field %s: %s", k, e)
+                # Fallback to string representation
+                result[k] = str(v)
+        return result
+    return convert
+
+
+# One lookup per key instead of walking the field sets in turn
+_DYNAMO_FIELD_CONVERTERS = {
+    **{k: str for k in _DYNAMO_STR_FIELDS},
+    **{k: _dynamo_state(k) for k in _DYNAMO_STATE_DEFAULTS},
+    **{k: functools.partial(_dynamo_flag, k) for k in _DYNAMO_BOOL_FIELDS},
+}
+_dynamo_dict = _dynamo_fields(_DYNAMO_FIELD_CONVERTERS)
+
+
+def _dynamo_list(data):
+    return [_to_dynamo(item) for item in data]
+
+
+def _dynamo_bool(data):
+    # DynamoDB items store booleans as 1/0
+    return _DYNAMO_TRUE if data else _DYNAMO_FALSE
+
+
+def _dynamo_int(data):
+    # Decimal takes ints exactly, no string round-trip needed
+    return Decimal(data)
+
+
+def _dynamo_float(data):
+    if not math.isfinite(data):
+        # DynamoDB rejects NaN/Infinity; keep the value readable instead
+        logger.warning("Error converting number %s to Decimal, using string instead", data)
+        return str(data)
+    if data.is_integer() and abs(data) < 2 ** 53:
+        return Decimal(int(data))
+    # Go through the shortest repr so 0.1 is stored as 0.1, not its binary expansion
+    return Decimal(repr(data))
+
+
+def _dynamo_number(data):
+    try:
+        if isinstance(data, float):
+            return _dynamo_float(data)
+        return _dynamo_int(int(data))
+    except (decimal.InvalidOperation, ValueError, TypeError):
+        # If conversion fails, return as string
+        logger.warning("Error converting number %s to Decimal, using string instead", data)
+        return str(data)
+
+
+def _dynamo_str(data):
+    # Empty strings are stored as None
+    return data if data else None
+
+
+def _dynamo_other(data):
+    # Subclasses of the dispatched types take the same path as their base type
+    if isinstance(data, dict):
+        return _dynamo_dict(data)
+    if isinstance(data, list):
+        return _dynamo_list(data)
+    if isinstance(data, (float, int)):
+        return _dynamo_number(data)
+    if isinstance(data, str):
+        return _dynamo_str(str(data))
+    # Safely convert other types (datetime included) to string
+    try:
+        return str(data)
+    except Exception as e:
+        logger.warning("Error converting %s to string: %s", type(data), e)
+        return "Error: unconvertible data"
+
+
+_DYNAMO_CONVERTERS = {
+    dict: _dynamo_dict,
+    list: _dynamo_list,
+    bool: _dynamo_bool,
+    int: _dynamo_int,
+    float: _dynamo_float,
+    str: _dynamo_str,
+}
+
+
+def _to_dynamo(data):
+    """Convert a value to DynamoDB-compatible types, dispatching on its exact type"""
+    return _DYNAMO_CONVERTERS.get(type(data), _dynamo_other)(data)
+
+
+# Record converters for fields whose types the save paths have already fixed:
+# _normalize_progress makes the counters ints and the flag a bool, and
+# save_workout_feedback makes the timestamp an int
+_dynamo_progress = _dynamo_fields({
+    **_DYNAMO_FIELD_CONVERTERS,
+    'exercises_completed': _dynamo_int,
+    'total_exercises': _dynamo_int,
+    'workout_completed': _dynamo_bool,
+})
+_dynamo_feedback = _dynamo_fields({
+    **_DYNAMO_FIELD_CONVERTERS,
+    'timestamp': _dynamo_int,
+})
+
+
+_ddb_resource = None
+_ddb_lock = threading.Lock()
+
+
+def _new_ddb_resource():
+    """Create a DynamoDB resource on its own session"""
+    # Adaptive retries absorb throttling in the SDK instead of surfacing it as
+    # a failed write
+    return boto3.session.Session().resource(
+        'dynamodb',
+        region_name=os.getenv('AWS_REGION', 'us-east-1'),
+        config=Config(
+            retries={'max_attempts': 10, 'mode': 'adaptive'},
+            max_pool_connections=64,
+        ),
+    )
+
+
+def _get_ddb():
+    """Return the process-wide DynamoDB resource, creating it on first use.
+
+    Only its low-level client, which is thread-safe, is shared across threads.
+    """
+    global _ddb_resource
+    with _ddb_lock:
+        if _ddb_resource is None:
+            _ddb_resource = _new_ddb_resource()
+        return _ddb_resource
+
+
+# Resources are not thread-safe, so each thread (migration workers and the
+# handlers' to_thread workers alike) builds its own
+_thread_local = threading.local()
+
+
+def _thread_ddb():
+    """Return the calling thread's DynamoDB resource"""
+    resource = getattr(_thread_local, 'resource', None)
+    if resource is None:
+        resource = _thread_local.resource = _new_ddb_resource()
+        _thread_local.tables = {}
+    return resource
+
+
+def _thread_table(table_name):
+    """Return the calling thread's Table resource for table_name"""
+    resource = _thread_ddb()
+    table = _thread_local.tables.get(table_name)
+    if table is None:
+        table = _thread_local.tables[table_name] = resource.Table(table_name)
+    return table
+
+
+def _migrate_chunk(table_name, items):
+    """Write one chunk of prepared items through a per-thread batch_writer"""
+    with _thread_table(table_name).batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+    return len(items)
+
 class Database:
     def __init__(self, use_dynamo=True):
         # Check if environment variable overrides the use_dynamo parameter
@@ -21,35 +461,59 @@ class Database:
         if env_use_dynamo is not None:
             # Convert string to boolean
             use_dynamo = env_use_dynamo.lower() in ('true', 'yes', '1')
-            logger.info(f"Using DynamoDB setting from environment: {use_dynamo}")
+            logger.info("Using DynamoDB setting from environment: %s", use_dynamo)
         
         self.use_dynamo = use_dynamo
+
+        # Per-user read caches for the per-message lookups; every write path
+        # that touches a user's record drops that user's entries. TTLCache is
+        # not thread-safe, hence the lock.
+        self._profile_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+        self._subscription_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+        self._cache_lock = threading.Lock()
+
+        # Workout previews are only kept in memory, in both storage modes
+        self.preview_workouts = {}
         
         if use_dynamo:
             try:
-                # Initialize DynamoDB client
-                self.dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-                
-                # Define table names
-                self.users_table = self.dynamodb.Table('fitness_bot_users')
-                self.workouts_table = self.dynamodb.Table('fitness_bot_active_workouts')
-                self.progress_table = self.dynamodb.Table('fitness_bot_progress')
-                self.feedback_table = self.dynamodb.Table('fitness_bot_feedback')
-                self.reminders_table = self.dynamodb.Table('fitness_bot_reminders')
+                # Shared by every Database instance so they reuse one connection pool
+                self.dynamodb = _get_ddb()
+
+                # Hot write paths go through the resource's low-level client with
+                # items serialized by one shared TypeSerializer; the client is
+                # thread-safe, the Table resources (see users_table etc.) are
+                # per thread
+                self._ddb_client = self.dynamodb.meta.client
+                self._serializer = TypeSerializer()
                 
                 logger.info("Successfully initialized DynamoDB tables")
             except Exception as e:
-                logger.error(f"Failed to initialize DynamoDB: {str(e)}")
+                logger.error("Failed to initialize DynamoDB: %s", e)
                 logger.info("Falling back to file-based storage")
                 self.use_dynamo = False
         
         if not self.use_dynamo:
             # Legacy file-based paths (keep for backward compatibility)
-            self.users_file = 'fitness_coach_bot/users.json'
-            self.active_workouts_file = 'fitness_coach_bot/active_workouts.json'
-            self.progress_file = 'fitness_coach_bot/progress.json'
-            self.feedback_file = 'fitness_coach_bot/feedback.json'
-            self.reminders_file = 'fitness_coach_bot/reminders.json'
+            ext = '.mp' if FILE_FORMAT == 'msgpack' else '.json'
+            self.users_file = f'fitness_coach_bot/users{ext}'
+            self.active_workouts_file = f'fitness_coach_bot/active_workouts{ext}'
+            self.progress_file = f'fitness_coach_bot/progress{ext}'
+            self.feedback_file = f'fitness_coach_bot/feedback{ext}'
+            self.reminders_file = f'fitness_coach_bot/reminders{ext}'
+
+            # Append-log and temp-snapshot paths for each collection, built once
+            collection_files = (
+                self.users_file, self.active_workouts_file, self.progress_file,
+                self.feedback_file, self.reminders_file,
+            )
+            self._log_paths = {f: f + '.log' for f in collection_files}
+            self._tmp_paths = {f: f + '.tmp' for f in collection_files}
+            # Snapshots this process wrote, keyed by path: (st_mtime_ns, data)
+            self._snapshot_cache = {}
+
+            if ext != '.json':
+                self._migrate_json_snapshots(collection_files)
             
             # Ensure files exist before attempting to read
             self._ensure_files_exist()
@@ -58,99 +522,125 @@ class Database:
             self.users = self._read_json(self.users_file)
             self.progress = self._read_json(self.progress_file)
             self.feedback = self._read_json(self.feedback_file)
-            self.preview_workouts = {}
+            self.active_workouts = self._read_json(self.active_workouts_file)
+            self.reminders = self._read_json(self.reminders_file)
+
+            # Sorted distinct workout dates per user, used for streaks
+            self._date_index = {
+                user_id: self._sorted_workout_dates(workouts)
+                for user_id, workouts in self.progress.items()
+            }
+
+            # Per-user NumPy views of progress, rebuilt lazily after each save
+            self._progress_arr = {}
+
+            # Per-user deques of the newest (workout_id, data) feedback pairs,
+            # oldest first; built on first read and extended by each save
+            self._recent_feedback = {}
+
+            # Raw O_APPEND descriptors and record counts for each collection
+            # log; only the writer thread writes through these
+            self._wal_fds = {
+                file_path: os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                for file_path, log_path in self._log_paths.items()
+            }
+            self._wal_counts = {}
+            self._unsynced = {}
+            # On-disk state of each collection as of our last load or write,
+            # so changes made by another process (e.g. the payment webhook)
+            # can be detected
+            self._file_sigs = {f: self._file_signature(f) for f in collection_files}
+
+            # Log appends are queued and written by a single background thread,
+            # so request handlers never block on file I/O
+            self._write_q = queue.Queue()
+            self._writer = threading.Thread(target=self._writer_loop, name='db-writer', daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+            self._migrate_feedback_timestamps()
+            self._migrate_subscription_epochs()
             
             logger.info("Using file-based storage")
     
+    # DynamoDB tables, resolved per thread since handlers call in from worker threads
+    @property
+    def users_table(self):
+        return _thread_table('fitness_bot_users')
+
+    @property
+    def workouts_table(self):
+        return _thread_table('fitness_bot_active_workouts')
+
+    @property
+    def progress_table(self):
+        return _thread_table('fitness_bot_progress')
+
+    @property
+    def feedback_table(self):
+        return _thread_table('fitness_bot_feedback')
+
+    @property
+    def reminders_table(self):
+        return _thread_table('fitness_bot_reminders')
+
+    def _migrate_feedback_timestamps(self):
+        """Backfill integer epoch timestamps on feedback saved with string timestamps"""
+        for user_id, entries in self.feedback.items():
+            if not isinstance(entries, dict):
+                continue
+            migrated = False
+            for data in entries.values():
+                if isinstance(data, dict) and isinstance(data.get('timestamp'), str):
+                    data['timestamp'] = _timestamp_epoch(data['timestamp'])
+                    migrated = True
+            if migrated:
+                self._append_delta(self.feedback_file, user_id, entries)
+
+    def _migrate_subscription_epochs(self):
+        """Backfill expiry_epoch on subscriptions saved with only an expiry_date"""
+        for user_id, user in self.users.items():
+            sub = user.get('subscription') if isinstance(user, dict) else None
+            if not isinstance(sub, dict) or 'expiry_epoch' in sub or not sub.get('expiry_date'):
+                continue
+            expiry_epoch = _expiry_epoch(sub['expiry_date'])
+            if expiry_epoch is not None:
+                sub['expiry_epoch'] = expiry_epoch
+                self._append_delta(self.users_file, user_id, user)
+
     def _prepare_for_dynamo(self, data):
         """Convert Python types to DynamoDB compatible types"""
         try:
-            if isinstance(data, dict):
-                # Process dict
-                result = {}
-                for k, v in data.items():
-                    # Handle special fields that must be strings
-                    if k in ['user_id', 'progress_id', 'workout_id', 'feedback_id']:
-                        result[k] = str(v)
-                    # Special handling for feedback state fields
-                    elif k in ['emotional_state', 'physical_state']:
-                        # Ensure these are valid strings and not None
-                        if v is None:
-                            if k == 'emotional_state':
-                                result[k] = 'neutral'
-                            else:
-                                result[k] = 'ok'
-                        else:
-                            result[k] = str(v)
-                    # Special handling for known boolean fields
-                    elif k in ['workout_completed', 'premium', 'is_completed', 'active', 'is_active']:
-                        # Convert all boolean-like values to 0/1 Decimal
-                        if isinstance(v, bool):
-                            result[k] = Decimal('1') if v else Decimal('0')
-                        elif isinstance(v, str) and v.lower() in ('true', 'false'):
-                            result[k] = Decimal('1') if v.lower() == 'true' else Decimal('0')
-                        elif v in (0, 1):
-                            result[k] = Decimal(str(v))
-                        else:
-                            logger.warning(f"Unexpected value for boolean field {k}: {v}, converting based on truthiness")
-                            result[k] = Decimal('1') if v else Decimal('0')
-                    else:
-                        try:
-                            result[k] = self._prepare_for_dynamo(v)
-                        except Exception as e:
-                            logger.warning(f"Error converting field {k}: {str(e)}")
-                            # Fallback to string representation
-                            result[k] = str(v)
-                return result
-            elif isinstance(data, list):
-                # Process list
-                return [self._prepare_for_dynamo(item) for item in data]
-            elif isinstance(data, bool):
-                # Convert boolean to integer (1 or 0) for DynamoDB
-                return Decimal('1') if data else Decimal('0')
-            elif isinstance(data, (float, int)):
-                # Convert numbers to Decimal for DynamoDB
-                try:
-                    return Decimal(str(data))
-                except (decimal.InvalidOperation, ValueError):
-                    # If conversion fails, return as string
-                    logger.warning(f"Error converting number {data} to Decimal, using string instead")
-                    return str(data)
-            elif data == '':
-                # Convert empty strings to None
-                return None
-            elif isinstance(data, (datetime, str)):
-                # Convert datetime to string, keep strings as is
-                return str(data)
-            else:
-                # Safely convert other types to string
-                try:
-                    return str(data)
-                except Exception as e:
-                    logger.warning(f"Error converting {type(data)} to string: {str(e)}")
-                    return "Error: unconvertible data"
+            return _to_dynamo(data)
         except Exception as e:
-            logger.error(f"Unexpected error in _prepare_for_dynamo: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in _prepare_for_dynamo: %s", e, exc_info=True)
             # Last resort fallback
             return str(data) if data is not None else None
 
+    def _put_item(self, table, item):
+        """Put a prepared item with the low-level client, skipping the Table resource's transform layer"""
+        serialize = self._serializer.serialize
+        self._ddb_client.put_item(
+            TableName=table.name,
+            Item={k: serialize(v) for k, v in item.items()},
+        )
+
     def save_active_workout(self, user_id, workout):
         """Save active workout to database"""
         user_id = str(user_id)
         try:
-            logger.info(f"Saving active workout for user {user_id}")
-            logger.info(f"Workout data: {workout}")
+            logger.info("Saving active workout for user %s", user_id)
+            logger.debug("Workout data: %s", workout)
             if self.use_dynamo:
                 workout_data = self._prepare_for_dynamo(workout)
                 workout_data['user_id'] = user_id
-                self.workouts_table.put_item(Item=workout_data)
+                self._put_item(self.workouts_table, workout_data)
             else:
-                workouts = self._read_json(self.active_workouts_file)
-                workouts[user_id] = workout
-                self._write_json(self.active_workouts_file, workouts)
+                self.active_workouts[user_id] = workout
+                self._append_delta(self.active_workouts_file, user_id, workout)
             logger.info("Active workout saved successfully")
         except Exception as e:
-            logger.error(f"Error saving active workout: {str(e)}", exc_info=True)
+            logger.error("Error saving active workout: %s", e, exc_info=True)
             raise
 
     def start_active_workout(self, user_id, workout):
@@ -167,46 +657,40 @@ class Database:
                 )
                 workout = response.get('Item', {})
             else:
-                workouts = self._read_json(self.active_workouts_file)
-                workout = workouts.get(user_id, {})
-            logger.info(f"Retrieved active workout for user {user_id}")
-            logger.info(f"Workout data: {workout}")
+                workout = self.active_workouts.get(user_id, {})
+            logger.info("Retrieved active workout for user %s", user_id)
+            logger.debug("Workout data: %s", workout)
             return workout
         except Exception as e:
-            logger.error(f"Error retrieving active workout: {str(e)}", exc_info=True)
+            logger.error("Error retrieving active workout: %s", e, exc_info=True)
             return None
 
     def save_preview_workout(self, user_id, workout):
         """Save preview workout to database"""
         user_id = str(user_id)
         try:
-            logger.info(f"Saving preview workout for user {user_id}")
-            if 'preview_workouts' not in self.__dict__:
-                self.preview_workouts = {}
+            logger.info("Saving preview workout for user %s", user_id)
             self.preview_workouts[user_id] = workout
             logger.info("Preview workout saved successfully")
         except Exception as e:
-            logger.error(f"Error saving preview workout: {str(e)}", exc_info=True)
+            logger.error("Error saving preview workout: %s", e, exc_info=True)
             raise
 
     def get_preview_workout(self, user_id):
         """Get preview workout from database"""
         user_id = str(user_id)
         try:
-            if 'preview_workouts' not in self.__dict__:
-                self.preview_workouts = {}
             workout = self.preview_workouts.get(user_id)
-            logger.info(f"Retrieved preview workout for user {user_id}")
+            logger.info("Retrieved preview workout for user %s", user_id)
             return workout
         except Exception as e:
-            logger.error(f"Error retrieving preview workout: {str(e)}", exc_info=True)
+            logger.error("Error retrieving preview workout: %s", e, exc_info=True)
             return None
 
     def clear_preview_workout(self, user_id):
         """Clear preview workout from database"""
         user_id = str(user_id)
-        if 'preview_workouts' in self.__dict__ and user_id in self.preview_workouts:
-            del self.preview_workouts[user_id]
+        self.preview_workouts.pop(user_id, None)
 
     def finish_active_workout(self, user_id):
         """Finish active workout and remove from database"""
@@ -217,30 +701,35 @@ class Database:
                 self.workouts_table.delete_item(
                     Key={'user_id': user_id}
                 )
-                logger.info(f"Removed active workout for user {user_id} from DynamoDB")
+                logger.info("Removed active workout for user %s from DynamoDB", user_id)
             else:
-                workouts = self._read_json(self.active_workouts_file)
-                if str(user_id) in workouts:
-                    del workouts[str(user_id)]
-                    self._write_json(self.active_workouts_file, workouts)
-                    logger.info(f"Removed active workout for user {user_id} from file")
+                if self.active_workouts.pop(user_id, None) is not None:
+                    self._append_delta(self.active_workouts_file, user_id, delete=True)
+                    logger.info("Removed active workout for user %s from file", user_id)
                 else:
-                    logger.info(f"No active workout found for user {user_id}")
+                    logger.info("No active workout found for user %s", user_id)
         except Exception as e:
-            logger.error(f"Error finishing active workout: {str(e)}")
+            logger.error("Error finishing active workout: %s", e)
 
     def update_active_workout(self, user_id, workout):
         """Update active workout in database"""
         return self.save_active_workout(user_id, workout)
 
+    def _invalidate_user_cache(self, user_id):
+        """Forget cached profile/subscription lookups for a user after a write"""
+        with self._cache_lock:
+            self._profile_cache.pop(user_id, None)
+            self._subscription_cache.pop(user_id, None)
+
     def save_user_profile(self, user_id, profile_data, telegram_handle=None):
         """Save user profile data with telegram handle"""
         user_id = str(user_id)
+        self._invalidate_user_cache(user_id)
         profile_data['telegram_handle'] = telegram_handle
-        profile_data['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        profile_data['last_updated'] = datetime.now().isoformat(' ', 'seconds')
 
         # Log the profile data being saved
-        logger.info(f"Saving user profile - ID: {user_id}, Data: {profile_data}")
+        logger.debug("Saving user profile - ID: %s, Data: %s", user_id, profile_data)
 
         if self.use_dynamo:
             # Prepare the data for DynamoDB
@@ -248,33 +737,42 @@ class Database:
             dynamo_profile['user_id'] = user_id
             self.users_table.put_item(Item=dynamo_profile)
         else:
-            users = self._read_json(self.users_file)
+            # Pick up records written by other instances (e.g. the payment
+            # webhook) before writing the whole user entry back
+            self._reload_users_if_changed()
             # Create or update user entry with profile under 'profile' field
-            if user_id not in users:
-                users[user_id] = {}
-            users[user_id]['profile'] = profile_data
-            self._write_json(self.users_file, users)
+            user = self.users.setdefault(user_id, {})
+            user['profile'] = profile_data
+            self._append_delta(self.users_file, user_id, user)
 
     def get_user_profile(self, user_id):
         """Get user profile data from the database"""
+        user_id = str(user_id)
+        if not self.use_dynamo:
+            # Another instance's write clears the cache through the reload
+            self._reload_users_if_changed()
+        with self._cache_lock:
+            profile = self._profile_cache.get(user_id)
+        if profile is not None:
+            return profile
+
         try:
             if self.use_dynamo:
                 try:
                     response = self.users_table.get_item(
-                        Key={'user_id': str(user_id)}
+                        Key={'user_id': user_id}
                     )
-                    if 'Item' in response:
-                        return response['Item'].get('profile', {})
-                    return {}
+                    profile = response.get('Item', {}).get('profile', {})
                 except Exception as e:
-                    logger.error(f"DynamoDB error getting user profile: {str(e)}")
+                    logger.error("DynamoDB error getting user profile: %s", e)
                     return {}
             else:
-                self._ensure_files_exist()
-                users_data = self._read_json(self.users_file)
-                return users_data.get(str(user_id), {}).get('profile', {})
+                profile = self.users.get(user_id, {}).get('profile', {})
+            with self._cache_lock:
+                self._profile_cache[user_id] = profile
+            return profile
         except Exception as e:
-            logger.error(f"Error getting user profile: {str(e)}")
+            logger.error("Error getting user profile: %s", e)
             return {}
             
     def get_user_data(self, user_id):
@@ -292,20 +790,20 @@ class Database:
                         return data
                     return {}
                 except Exception as e:
-                    logger.error(f"DynamoDB error getting user data: {str(e)}")
+                    logger.error("DynamoDB error getting user data: %s", e)
                     return {}
             else:
-                self._ensure_files_exist()
-                users_data = self._read_json(self.users_file)
+                self._reload_users_if_changed()
                 # Get all user data except 'profile' which is handled separately
-                user_entry = users_data.get(str(user_id), {})
+                user_entry = self.users.get(str(user_id), {})
                 return {k: v for k, v in user_entry.items() if k != 'profile'}
         except Exception as e:
-            logger.error(f"Error getting user data: {str(e)}")
+            logger.error("Error getting user data: %s", e)
             return {}
             
     def save_user_data(self, user_id, data):
         """Save general user data to the database"""
+        self._invalidate_user_cache(str(user_id))
         try:
             if self.use_dynamo:
                 try:
@@ -337,73 +835,88 @@ class Database:
                     )
                     return True
                 except Exception as e:
-                    logger.error(f"DynamoDB error saving user data: {str(e)}")
+                    logger.error("DynamoDB error saving user data: %s", e)
                     return False
             else:
                 self._ensure_files_exist()
-                users_data = self._read_json(self.users_file)
+                self._reload_users_if_changed()
                 
                 # Create or update user entry
-                if str(user_id) not in users_data:
-                    users_data[str(user_id)] = {}
+                user_entry = self.users.setdefault(str(user_id), {})
                 
                 # Update all fields except 'profile' which is handled separately
                 for key, value in data.items():
                     if key != 'profile':  # Don't overwrite profile
-                        users_data[str(user_id)][key] = value
+                        user_entry[key] = value
                 
-                self._write_json(self.users_file, users_data)
+                self._append_delta(self.users_file, str(user_id), user_entry)
                 return True
         except Exception as e:
-            logger.error(f"Error saving user data: {str(e)}")
+            logger.error("Error saving user data: %s", e)
             return False
             
+    def _normalize_progress(self, user_id, workout_data):
+        """Return a copy of a progress record with date, ids and counters filled in and typed"""
+        # Create a copy of workout data to avoid modifying the original
+        workout_data = workout_data.copy()
+        
+        # Add timestamp if not present
+        if 'date' not in workout_data:
+            now = datetime.now()
+            workout_data['date'] = now.isoformat(' ', 'seconds')
+            workout_data['_date_obj'] = now.date()
+            workout_data['_date_ord'] = workout_data['_date_obj'].toordinal()
+
+        # Store the canonical calendar day so readers never need the format cascade
+        if 'date_iso' not in workout_data:
+            workout_date = self._parsed_date(workout_data)
+            if workout_date:
+                workout_data['date_iso'] = workout_date.isoformat()
+        
+        # Ensure user_id is string in workout_data
+        workout_data['user_id'] = str(workout_data.get('user_id', user_id))
+        
+        # Add a unique progress_id for DynamoDB if not present
+        if 'progress_id' not in workout_data:
+            workout_data['progress_id'] = f"{user_id}_{workout_data.get('workout_id', datetime.now().strftime('%Y%m%d_%H%M%S'))}"
+        
+        # Sanitize/validate all fields to prevent conversion errors
+        # These are the fields we expect in a progress record
+        for field in ['exercises_completed', 'total_exercises']:
+            if field in workout_data:
+                try:
+                    workout_data[field] = int(workout_data[field])
+                except (ValueError, TypeError):
+                    workout_data[field] = 0
+        
+        # Ensure boolean fields are properly formatted
+        if 'workout_completed' in workout_data:
+            workout_data['workout_completed'] = bool(workout_data['workout_completed'])
+        return workout_data
+
+    def _progress_item(self, workout_data):
+        """Convert a normalized progress record into a DynamoDB item"""
+        dynamo_data = _dynamo_progress(_without_private(workout_data))
+        
+        # Ensure critical fields are strings
+        dynamo_data['user_id'] = str(dynamo_data['user_id'])
+        dynamo_data['progress_id'] = str(dynamo_data['progress_id'])
+        return dynamo_data
+
     def save_workout_progress(self, user_id, workout_data):
         """Save workout progress to database"""
         user_id = str(user_id)  # Ensure user_id is string
         
         try:
-            # Create a copy of workout data to avoid modifying the original
-            workout_data = workout_data.copy()
-            
-            # Add timestamp if not present
-            if 'date' not in workout_data:
-                workout_data['date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Ensure user_id is string in workout_data
-            workout_data['user_id'] = str(workout_data.get('user_id', user_id))
-            
-            # Add a unique progress_id for DynamoDB if not present
-            if 'progress_id' not in workout_data:
-                workout_data['progress_id'] = f"{user_id}_{workout_data.get('workout_id', datetime.now().strftime('%Y%m%d_%H%M%S'))}"
-            
-            # Sanitize/validate all fields to prevent conversion errors
-            # These are the fields we expect in a progress record
-            for field in ['exercises_completed', 'total_exercises']:
-                if field in workout_data:
-                    try:
-                        workout_data[field] = int(workout_data[field])
-                    except (ValueError, TypeError):
-                        workout_data[field] = 0
-            
-            # Ensure boolean fields are properly formatted
-            if 'workout_completed' in workout_data:
-                workout_data['workout_completed'] = bool(workout_data['workout_completed'])
+            workout_data = self._normalize_progress(user_id, workout_data)
             
             if self.use_dynamo:
                 try:
-                    # Prepare data for DynamoDB
-                    dynamo_data = self._prepare_for_dynamo(workout_data)
-                    
-                    # Ensure critical fields are strings
-                    dynamo_data['user_id'] = str(dynamo_data['user_id'])
-                    dynamo_data['progress_id'] = str(dynamo_data['progress_id'])
-                    
                     # Save to DynamoDB
-                    self.progress_table.put_item(Item=dynamo_data)
-                    logger.info(f"Saved workout progress for user {user_id} to DynamoDB")
+                    self._put_item(self.progress_table, self._progress_item(workout_data))
+                    logger.info("Saved workout progress for user %s to DynamoDB", user_id)
                 except Exception as e:
-                    logger.error(f"Error saving to DynamoDB: {str(e)}", exc_info=True)
+                    logger.error("Error saving to DynamoDB: %s", e, exc_info=True)
                     # Fallback to file storage
                     logger.info("Falling back to file storage for progress")
                     self._save_progress_to_file(user_id, workout_data)
@@ -411,10 +924,37 @@ class Database:
                 self._save_progress_to_file(user_id, workout_data)
                 
         except Exception as e:
-            logger.error(f"Error saving workout progress: {str(e)}", exc_info=True)
+            logger.error("Error saving workout progress: %s", e, exc_info=True)
+            raise
+
+    def save_workout_progress_bulk(self, user_id, workouts):
+        """Save several workout progress records at once, batching the DynamoDB writes"""
+        user_id = str(user_id)
+        
+        try:
+            records = [self._normalize_progress(user_id, w) for w in workouts]
+            if not records:
+                return
+            
+            if self.use_dynamo:
+                try:
+                    # batch_writer sends BatchWriteItem requests of 25 and retries unprocessed items
+                    with self.progress_table.batch_writer(overwrite_by_pkeys=['user_id', 'progress_id']) as batch:
+                        for record in records:
+                            batch.put_item(Item=self._progress_item(record))
+                    logger.info("Saved %s workout progress records for user %s to DynamoDB", len(records), user_id)
+                except Exception as e:
+                    logger.error("Error batch saving to DynamoDB: %s", e, exc_info=True)
+                    logger.info("Falling back to file storage for progress")
+                    self._save_progress_to_file(user_id, *records)
+            else:
+                self._save_progress_to_file(user_id, *records)
+                
+        except Exception as e:
+            logger.error("Error saving workout progress: %s", e, exc_info=True)
             raise
     
-    def _save_progress_to_file(self, user_id, workout_data):
+    def _save_progress_to_file(self, user_id, *workouts):
         """Helper method to save progress to file"""
         try:
             # Load existing progress
@@ -426,31 +966,43 @@ class Database:
                 self.progress[user_id] = []
             
             # Add new workout data
-            self.progress[user_id].append(workout_data)
+            self.progress[user_id].extend(workouts)
+
+            # Drop the cached arrays and keep the sorted date index in step
+            self._progress_arr.pop(user_id, None)
+            dates = self._date_index.setdefault(user_id, SortedList())
+            for workout_data in workouts:
+                workout_date = self._parsed_date(workout_data)
+                if workout_date and workout_date not in dates:
+                    dates.add(workout_date)
             
             # Save to file
-            self._write_json(self.progress_file, self.progress)
-            logger.info(f"Saved workout progress for user {user_id} to file")
+            self._append_delta(self.progress_file, user_id, [_without_private(w) for w in workouts], op="a")
+            logger.info("Saved workout progress for user %s to file", user_id)
         except Exception as e:
-            logger.error(f"Error saving progress to file: {str(e)}", exc_info=True)
+            logger.error("Error saving progress to file: %s", e, exc_info=True)
 
-    def get_user_progress(self, user_id):
-        """Get user progress data"""
+    def get_user_progress(self, user_id, projection=None):
+        """Get user progress data, optionally only the named attributes (DynamoDB)"""
         if self.use_dynamo:
             try:
-                response = self.progress_table.query(
-                    KeyConditionExpression=Key('user_id').eq(str(user_id))
-                )
+                query_args = {'KeyConditionExpression': Key('user_id').eq(str(user_id))}
+                if projection:
+                    # Placeholders keep reserved words such as "date" usable in the projection
+                    names = {f"#a{i}": attr for i, attr in enumerate(projection)}
+                    query_args['ProjectionExpression'] = ", ".join(names)
+                    query_args['ExpressionAttributeNames'] = names
+                response = self.progress_table.query(**query_args)
                 if response['Items']:
                     return response['Items']
                 return []
             except Exception as e:
-                logger.error(f"DynamoDB error getting user progress: {e}")
+                logger.error("DynamoDB error getting user progress: %s", e)
                 return []
         else:
-            # File-based storage
-            progress = self._read_json(self.progress_file)
-            return progress.get(str(user_id), [])
+            # File-based storage; self.progress is kept current by _save_progress_to_file,
+            # so parsed-date caches on the records survive between calls
+            return self.progress.get(str(user_id), [])
 
     def get_user_workouts(self, user_id, limit=None):
         """Get user workout history with optional limit"""
@@ -465,183 +1017,180 @@ class Database:
             
         return workouts
 
-    def get_workout_streak(self, user_id):
-        """Calculate current and longest workout streaks"""
-        user_id = str(user_id)
-        workouts = self.get_user_progress(user_id)
-        if not workouts:
-            return {"current_streak": 0, "longest_streak": 0}
+    def _parsed_date(self, workout):
+        """Return the workout's date, parsing it once and caching it on the record"""
+        workout_date = workout.get('_date_obj')
+        if workout_date is None:
+            date_iso = workout.get('date_iso')
+            if date_iso:
+                workout_date = date.fromisoformat(date_iso)
+            else:
+                # Records saved before date_iso existed
+                workout_date = _parse_workout_date(workout['date'])
+            workout['_date_obj'] = workout_date
+            workout['_date_ord'] = workout_date.toordinal() if workout_date else None
+        return workout_date
+
+    def _date_ordinal(self, workout):
+        """Return the workout's date as a day ordinal (int), cached on the record"""
+        ordinal = workout.get('_date_ord')
+        if ordinal is None:
+            self._parsed_date(workout)
+            ordinal = workout.get('_date_ord')
+        return ordinal
+
+    def _logged_date_ordinal(self, workout):
+        """Return the workout's day ordinal, or log and return None if its date can't be read"""
+        try:
+            ordinal = self._date_ordinal(workout)
+        except Exception as e:
+            logger.error("Error processing workout date: %s", e)
+            return None
+        if ordinal is None:
+            logger.error("Failed to parse date '%s' in any format", workout['date'])
+        return ordinal
 
-        # Sort workouts by date, handling various date formats
-        workout_dates = []
+    def _sorted_workout_dates(self, workouts):
+        """Return the distinct dates of the given workouts in ascending order"""
+        workout_dates = set()
         for w in workouts:
             try:
-                date_str = w['date']
-                workout_date = None
-                
-                # Try parsing with different formats
-                formats_to_try = [
-                    '%Y-%m-%d %H:%M:%S',  # Format with time
-                    '%Y-%m-%d',           # Format without time
-                    '%d-%m-%Y',           # Alternative format
-                    '%Y-%m-%d %H:%M',     # Format with hours and minutes only
-                ]
-                
-                for date_format in formats_to_try:
-                    try:
-                        if ' ' in date_str and '%H' not in date_format:
-                            # Skip date-only formats for strings with time
-                            continue
-                        workout_date = datetime.strptime(date_str, date_format).date()
-                        break  # Stop trying formats if one succeeds
-                    except ValueError:
-                        continue
-                
-                # If all formats failed, try extracting just the date part
-                if workout_date is None and ' ' in date_str:
-                    date_part = date_str.split(' ')[0]
-                    try:
-                        workout_date = datetime.strptime(date_part, '%Y-%m-%d').date()
-                    except ValueError:
-                        pass
-                
+                workout_date = self._parsed_date(w)
                 if workout_date:
-                    workout_dates.append(workout_date)
+                    workout_dates.add(workout_date)
                 else:
-                    logger.error(f"Failed to parse date '{date_str}' in any format")
+                    logger.error("Failed to parse date '%s' in any format", w['date'])
                 
             except Exception as e:
-                logger.error(f"Error processing workout date: {str(e)}", exc_info=True)
-        
-        # Remove duplicates and sort
-        workout_dates = sorted(set(workout_dates))
+                logger.error("Error processing workout date: %s", e)
+        return SortedList(workout_dates)
 
+    def get_workout_streak(self, user_id):
+        """Calculate current and longest workout streaks"""
+        user_id = str(user_id)
+        if self.use_dynamo:
+            workout_dates = self._sorted_workout_dates(
+                self.get_user_progress(user_id, projection=('date', 'date_iso'))
+            )
+        else:
+            # File storage keeps the distinct dates already sorted
+            workout_dates = self._date_index.get(user_id, ())
+        return self._streaks_from_dates(workout_dates)
+
+    def _streaks_from_dates(self, workout_dates):
+        """Calculate current and longest streaks from distinct dates in ascending order"""
         if not workout_dates:
             return {"current_streak": 0, "longest_streak": 0}
 
-        # Calculate streaks
-        current_streak = 0
-        longest_streak = 0
-        streak_count = 0
-        today = datetime.now().date()
-
-        # Check if the last workout was today or yesterday to continue the streak
-        last_workout = workout_dates[-1]
-        if last_workout < today - timedelta(days=1):
+        # Building int64 ordinals is much cheaper than converting date objects
+        # to datetime64
+        n = len(workout_dates)
+        return self._streaks_from_ordinals(
+            np.fromiter((d.toordinal() for d in workout_dates), dtype=np.int64, count=n)
+        )
+
+    def _streaks_from_ordinals(self, ordinals):
+        """Calculate current and longest streaks from a non-empty ascending array of distinct day ordinals"""
+        # Day gaps between consecutive workout days; a run of 1s is a streak
+        n = ordinals.size
+        gaps = np.diff(ordinals)
+        run_starts = np.flatnonzero(np.concatenate(([True], gaps != 1, [True])))
+        longest_streak = int(np.max(np.diff(run_starts)))
+
+        # The current streak is the last run, if the last workout was today or yesterday
+        if ordinals[-1] < datetime.now().date().toordinal() - 1:
             current_streak = 0
         else:
-            # Count backwards from the last workout
-            for i in range(len(workout_dates) - 1, -1, -1):
-                if i == len(workout_dates) - 1:
-                    streak_count = 1
-                    continue
-
-                if workout_dates[i] == workout_dates[i + 1] - timedelta(days=1):
-                    streak_count += 1
-                else:
-                    break
-
-            current_streak = streak_count
-
-        # Calculate longest streak
-        streak_count = 1
-        for i in range(1, len(workout_dates)):
-            if workout_dates[i] == workout_dates[i-1] + timedelta(days=1):
-                streak_count += 1
-            else:
-                longest_streak = max(longest_streak, streak_count)
-                streak_count = 1
-
-        longest_streak = max(longest_streak, streak_count, current_streak)
+            current_streak = n - int(run_starts[-2])
 
         return {
             "current_streak": current_streak,
             "longest_streak": longest_streak
         }
 
+    def _progress_arrays(self, user_id):
+        """Return the user's workout day ordinals and exercise counts as NumPy arrays"""
+        arrays = None if self.use_dynamo else self._progress_arr.get(user_id)
+        if arrays is not None:
+            return arrays
+
+        days, totals, completeds, dones = [], [], [], []
+        progress = self.get_user_progress(
+            user_id,
+            projection=('date', 'date_iso', 'total_exercises', 'exercises_completed', 'workout_completed'),
+        )
+        # Records with unreadable dates still count towards the overall totals
+        done_count = 0
+        for workout in progress:
+            done = 1 if workout.get('workout_completed', False) else 0
+            done_count += done
+            try:
+                workout_ord = self._date_ordinal(workout)
+                if workout_ord is None:
+                    logger.error("Failed to parse date '%s' in any format", workout['date'])
+                    continue
+
+                total = workout.get('total_exercises', 0)
+                completed = workout.get('exercises_completed', 0)
+
+                # Ensure values are integers
+                try:
+                    total = int(total)
+                    completed = int(completed)
+                except (ValueError, TypeError):
+                    logger.warning("Non-integer exercise counts for workout on %s: total=%s, completed=%s", workout['_date_obj'], total, completed)
+                    total = 0 if total == 0 else 1
+                    completed = 0 if completed == 0 else 1
+
+                days.append(workout_ord)
+                totals.append(total)
+                completeds.append(completed)
+                dones.append(done)
+            except Exception as e:
+                logger.error("Error processing workout for progress stats: %s", e)
+
+        arrays = {
+            # Plain int64 day ordinals; much cheaper to build than datetime64 from date objects
+            'days': np.array(days, dtype=np.int64),
+            'total': np.array(totals, dtype=np.int32),
+            'completed': np.array(completeds, dtype=np.int32),
+            # workout_completed flags
+            'done': np.array(dones, dtype=np.int32),
+            'workouts': len(progress),
+            'workouts_done': done_count,
+        }
+        if not self.use_dynamo:
+            self._progress_arr[user_id] = arrays
+        return arrays
+
     def get_workout_intensity_stats(self, user_id, days=30):
         """Get workout intensity statistics for the last N days"""
         user_id = str(user_id)
-        workouts = self.get_user_progress(user_id)
-        if not workouts:
+        arrays = self._progress_arrays(user_id)
+        workout_days = arrays['days']
+        if not workout_days.size:
             return []
 
         # Get date range
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days)
+        end_ord = datetime.now().date().toordinal()
+        start_ord = end_ord - days
 
-        # Group workouts by date
-        daily_stats = defaultdict(lambda: {"total_exercises": 0, "completed_exercises": 0})
+        # Group workouts in the window by date and sum their exercise counts
+        mask = (workout_days >= start_ord) & (workout_days <= end_ord)
+        days_in_window, inverse = np.unique(workout_days[mask], return_inverse=True)
+        totals = np.bincount(inverse, weights=arrays['total'][mask], minlength=days_in_window.size)
+        completeds = np.bincount(inverse, weights=arrays['completed'][mask], minlength=days_in_window.size)
 
-        for workout in workouts:
-            try:
-                date_str = workout['date']
-                workout_date = None
-                
-                # Try parsing with different formats
-                formats_to_try = [
-                    '%Y-%m-%d %H:%M:%S',  # Format with time
-                    '%Y-%m-%d',           # Format without time
-                    '%d-%m-%Y',           # Alternative format
-                    '%Y-%m-%d %H:%M',     # Format with hours and minutes only
-                ]
-                
-                for date_format in formats_to_try:
-                    try:
-                        if ' ' in date_str and '%H' not in date_format:
-                            # Skip date-only formats for strings with time
-                            continue
-                        workout_date = datetime.strptime(date_str, date_format).date()
-                        break  # Stop trying formats if one succeeds
-                    except ValueError:
-                        continue
-                
-                # If all formats failed, try extracting just the date part
-                if workout_date is None and ' ' in date_str:
-                    date_part = date_str.split(' ')[0]
-                    try:
-                        workout_date = datetime.strptime(date_part, '%Y-%m-%d').date()
-                    except ValueError:
-                        logger.error(f"Failed to parse date '{date_str}' in any format")
-                        continue
-                
-                if not workout_date:
-                    logger.error(f"Failed to parse date '{date_str}' in any format")
-                    continue
-                
-                if start_date <= workout_date <= end_date:
-                    date_key = workout_date.strftime('%Y-%m-%d')
-                    total = workout.get('total_exercises', 0)
-                    completed = workout.get('exercises_completed', 0)
-                    
-                    # Ensure values are integers
-                    try:
-                        total = int(total)
-                        completed = int(completed)
-                    except (ValueError, TypeError):
-                        logger.warning(f"Non-integer exercise counts for workout on {date_key}: total={total}, completed={completed}")
-                        total = 0 if total == 0 else 1
-                        completed = 0 if completed == 0 else 1
-                    
-                    daily_stats[date_key]['total_exercises'] += total
-                    daily_stats[date_key]['completed_exercises'] += completed
-            except Exception as e:
-                logger.error(f"Error processing workout for intensity stats: {str(e)}", exc_info=True)
-
-        # Convert to list and sort by date
+        # np.unique returns the days already sorted
         stats = []
-        for date, data in daily_stats.items():
-            try:
-                completion_rate = data['completed_exercises'] / data['total_exercises'] * 100 if data['total_exercises'] > 0 else 0
-                stats.append({
-                    "date": date,
-                    "completion_rate": completion_rate,
-                    "total_exercises": data['total_exercises']
-                })
-            except Exception as e:
-                logger.error(f"Error calculating stats for date {date}: {str(e)}")
-                
-        return sorted(stats, key=lambda x: x['date'])
+        for day, total, completed in zip(days_in_window, totals, completeds):
+            total = int(total)
+            stats.append({
+                "date": date.fromordinal(int(day)).isoformat(),
+                "completion_rate": float(completed) / total * 100 if total > 0 else 0,
+                "total_exercises": total
+            })
+        return stats
 
     def save_workout_feedback(self, user_id, workout_id, feedback_data):
         """Save workout feedback"""
@@ -650,7 +1199,7 @@ class Database:
         
         # Ensure feedback_data is properly structured
         if not isinstance(feedback_data, dict):
-            logger.error(f"Invalid feedback data format: {feedback_data}")
+            logger.error("Invalid feedback data format: %s", feedback_data)
             return False
             
         # Ensure we have the in-memory feedback structure
@@ -661,14 +1210,16 @@ class Database:
         if user_id not in self.feedback:
             self.feedback[user_id] = {}
 
-        # Add timestamp to feedback data if not present
+        # Stamp feedback with integer epoch seconds, converting a caller-supplied string
         if 'timestamp' not in feedback_data:
-            feedback_data['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            feedback_data['timestamp'] = int(time.time())
+        else:
+            feedback_data['timestamp'] = _timestamp_epoch(feedback_data['timestamp'])
             
         # Make sure we have both emotional and physical state set to something valid
         # This prevents None values from causing issues when analyzing feedback later
         if feedback_data.get('emotional_state') is None and feedback_data.get('physical_state') is None:
-            logger.warning(f"Both emotional and physical states are None for feedback from user {user_id}")
+            logger.warning("Both emotional and physical states are None for feedback from user %s", user_id)
             return False
             
         # Set default values for None states
@@ -679,142 +1230,161 @@ class Database:
             feedback_data['physical_state'] = 'ok'
             
         # Log details about the feedback being saved
-        logger.info(f"Saving feedback for user {user_id}, workout {workout_id}")
-        logger.debug(f"Feedback data: {feedback_data}")
+        logger.info("Saving feedback for user %s, workout %s", user_id, workout_id)
+        logger.debug("Feedback data: %s", feedback_data)
 
         try:
             if self.use_dynamo:
                 # Prepare data for DynamoDB and ensure required fields
-                dynamo_data = self._prepare_for_dynamo(feedback_data)
+                dynamo_data = _dynamo_feedback(feedback_data)
                 dynamo_data['user_id'] = user_id
                 dynamo_data['workout_id'] = workout_id
                 dynamo_data['feedback_id'] = feedback_data.get('feedback_id', f"feedback_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
                 
                 # Save to DynamoDB
-                self.feedback_table.put_item(Item=dynamo_data)
-                logger.info(f"Saved feedback to DynamoDB for user {user_id}, workout {workout_id}")
+                self._put_item(self.feedback_table, dynamo_data)
+                logger.info("Saved feedback to DynamoDB for user %s, workout %s", user_id, workout_id)
             else:
-                # Load feedback from file
-                file_feedback = self._read_json(self.feedback_file)
-                
-                # Initialize structure if needed
-                if user_id not in file_feedback:
-                    file_feedback[user_id] = {}
-                    
-                # Save feedback
-                file_feedback[user_id][workout_id] = feedback_data
-                
-                # Write back to file
-                self._write_json(self.feedback_file, file_feedback)
-                
-                # Update in-memory representation
+                # Update in-memory representation; re-inserting moves a re-rated
+                # workout to the end, keeping each user's entries in save
+                # (oldest-first) order
+                self.feedback[user_id].pop(workout_id, None)
                 self.feedback[user_id][workout_id] = feedback_data
-                logger.info(f"Saved feedback to file for user {user_id}, workout {workout_id}")
+                self._note_recent_feedback(user_id, workout_id, feedback_data)
+                
+                # Append just this entry; replay moves it to the end like the pop above
+                self._append_delta(self.feedback_file, user_id, {workout_id: feedback_data}, op="m")
+                logger.info("Saved feedback to file for user %s, workout %s", user_id, workout_id)
                 
             return True
         except Exception as e:
-            logger.error(f"Error saving feedback: {str(e)}", exc_info=True)
+            logger.error("Error saving feedback: %s", e, exc_info=True)
             return False
 
-    def get_user_feedback(self, user_id):
-        """Get user's workout feedback history"""
-        user_id = str(user_id)
+    def _load_user_feedback(self, user_id, limit=None):
+        """Return a user's valid feedback entries as (workout_id, data) pairs in stored order.
+
+        With a limit and a timestamp index configured, only the newest entries are fetched.
+        """
+        if self.use_dynamo:
+            query_args = {'KeyConditionExpression': Key('user_id').eq(user_id)}
+            newest_first = bool(limit and FEEDBACK_TIME_INDEX)
+            if newest_first:
+                query_args.update(IndexName=FEEDBACK_TIME_INDEX, ScanIndexForward=False, Limit=limit)
+            response = self.feedback_table.query(**query_args)
+            items = response.get('Items', [])
+            if newest_first:
+                items.reverse()  # Back to oldest-first like the unindexed query
+            # Key items by workout_id and drop malformed rows in a single pass
+            feedback = {
+                item['workout_id']: item
+                for item in items
+                if 'workout_id' in item and 'timestamp' in item
+            }
+            return list(feedback.items())
+
+        feedback = self.feedback.get(user_id, {})
+
+        # If feedback is a list (from previous version) or not a dict, convert or use empty dict
+        if isinstance(feedback, list):
+            logger.warning("Feedback for user %s is a list, converting to dict", user_id)
+            feedback_dict = {}
+            for item in feedback:
+                if isinstance(item, dict) and 'workout_id' in item:
+                    feedback_dict[item['workout_id']] = item
+            feedback = feedback_dict
+        
+        # If feedback is empty or not a dict, return an empty list
+        if not isinstance(feedback, dict):
+            logger.warning("Invalid feedback format for user %s, using empty dict", user_id)
+            return []
+
+        return [
+            (workout_id, data)
+            for workout_id, data in feedback.items()
+            if isinstance(data, dict) and 'timestamp' in data  # Ensure data is valid
+        ]
+
+    def _note_recent_feedback(self, user_id, workout_id, feedback_data):
+        """Move a just-saved feedback entry to the newest end of the user's recent deque"""
+        recent = self._recent_feedback.get(user_id)
+        if recent is None:
+            return
+        if recent and feedback_data['timestamp'] < _timestamp_epoch(recent[-1][1]['timestamp']):
+            # Backdated entry; rebuild from the full feedback on the next read
+            del self._recent_feedback[user_id]
+            return
+        for i, (recent_id, _) in enumerate(recent):
+            if recent_id == workout_id:
+                del recent[i]
+                break
+        recent.append((workout_id, feedback_data))
+
+    def _newest_feedback(self, user_id, limit):
+        """Return up to `limit` of a user's valid feedback entries as (workout_id, data) pairs, newest first"""
+        if self.use_dynamo or limit > RECENT_FEEDBACK_SIZE:
+            entries = self._load_user_feedback(user_id, limit)
+            return heapq.nlargest(limit, entries, key=lambda x: _timestamp_epoch(x[1]['timestamp']))
+
+        recent = self._recent_feedback.get(user_id)
+        if recent is None:
+            entries = self._load_user_feedback(user_id)
+            newest = heapq.nlargest(RECENT_FEEDBACK_SIZE, entries, key=lambda x: _timestamp_epoch(x[1]['timestamp']))
+            newest.reverse()
+            recent = self._recent_feedback[user_id] = deque(newest, maxlen=RECENT_FEEDBACK_SIZE)
+        return list(itertools.islice(reversed(recent), limit))
+
+    def _sorted_feedback_items(self, user_id, limit=None):
+        """Return a user's valid feedback as (workout_id, data) pairs, newest first"""
+        entries = self._load_user_feedback(user_id, limit)
+
+        # Entries are saved oldest-first, so the newest-first view is
+        # usually just a reversal; fall back to sorting for older data
         try:
-            if self.use_dynamo:
-                response = self.feedback_table.query(
-                    KeyConditionExpression=Key('user_id').eq(user_id)
-                )
-                feedback_items = response.get('Items', [])
-                
-                # Convert the list of items to a dictionary with workout_id as key
-                feedback = {}
-                for item in feedback_items:
-                    if 'workout_id' in item:
-                        feedback[item['workout_id']] = item
-                
+            timestamps = [_timestamp_epoch(data['timestamp']) for _, data in entries]
+            if all(a <= b for a, b in zip(timestamps, timestamps[1:])):
+                entries.reverse()
             else:
-                all_feedback = self._read_json(self.feedback_file)
-                feedback = all_feedback.get(user_id, {})
-
-            # If feedback is a list (from previous version) or not a dict, convert or use empty dict
-            if isinstance(feedback, list):
-                logger.warning(f"Feedback for user {user_id} is a list, converting to dict")
-                feedback_dict = {}
-                for item in feedback:
-                    if isinstance(item, dict) and 'workout_id' in item:
-                        feedback_dict[item['workout_id']] = item
-                feedback = feedback_dict
-            
-            # If feedback is empty or not a dict, return an empty dict
-            if not isinstance(feedback, dict):
-                logger.warning(f"Invalid feedback format for user {user_id}, using empty dict")
-                return {}
+                entries.sort(key=lambda x: _timestamp_epoch(x[1]['timestamp']), reverse=True)
+        except Exception as sort_error:
+            logger.error("Error sorting feedback: %s", sort_error)  # Keep unsorted feedback if sorting fails
+        return entries[:limit] if limit else entries
 
-            # Sort feedback by timestamp to get the most recent ones first
-            try:
-                sorted_feedback = sorted(
-                    [
-                        (workout_id, data) 
-                        for workout_id, data in feedback.items()
-                        if isinstance(data, dict) and 'timestamp' in data  # Ensure data is valid
-                    ],
-                    key=lambda x: x[1]['timestamp'],
-                    reverse=True
-                )
-                return dict(sorted_feedback)
-            except Exception as sort_error:
-                logger.error(f"Error sorting feedback: {sort_error}")
-                return feedback  # Return unsorted feedback if sorting fails
-        
+    def get_user_feedback(self, user_id, limit=None):
+        """Get user's workout feedback history, newest first, optionally only the latest `limit`"""
+        try:
+            return dict(self._sorted_feedback_items(str(user_id), limit))
         except Exception as e:
-            logger.error(f"Error getting user feedback: {e}", exc_info=True)
+            logger.error("Error getting user feedback: %s", e, exc_info=True)
             return {}  # Return empty dict on error
 
     def get_recent_feedback(self, user_id, limit=5):
         """Get user's recent workout feedback for adaptation"""
         try:
-            feedback = self.get_user_feedback(user_id)
+            recent = self._newest_feedback(str(user_id), limit)
             
             # Handle empty feedback
-            if not feedback:
-                logger.info(f"No feedback found for user {user_id}, using default values")
+            if not recent:
+                logger.info("No feedback found for user %s, using default values", user_id)
                 return {
                     'emotional_state': 'good',  # Default state if no feedback
                     'physical_state': 'ok',
                     'consecutive_negative': 0
                 }
-                
-            recent = list(feedback.items())[:limit]
 
-            logger.info(f"Getting recent feedback for user {user_id}")
-            logger.info(f"Found {len(recent)} recent feedback entries")
+            logger.info("Getting recent feedback for user %s", user_id)
+            logger.info("Found %s recent feedback entries", len(recent))
 
             # Analyze recent feedback
-            emotional_negative = 0
-            physical_stats = {'too_easy': 0, 'ok': 0, 'tired': 0}
+            logger.debug("Analyzing feedback entries: %s", recent)
+            emotional_negative = sum(1 for _, data in recent if data.get('emotional_state') == 'not_fun')
+            physical_stats = Counter(data.get('physical_state', 'ok') for _, data in recent)
+
+            # Determine predominant physical state among the known states;
+            # max() keeps the first of equal counts, so 'ok' wins ties, then
+            # 'too_easy'
+            predominant_physical = max(_PHYSICAL_STATE_PRIORITY, key=physical_stats.__getitem__)
 
-            for workout_id, data in recent:
-                logger.info(f"Analyzing feedback for workout {workout_id}: {data}")
-                
-                # Get emotional state with default if missing
-                emotional_state = data.get('emotional_state')
-                if emotional_state == 'not_fun':
-                    emotional_negative += 1
-                
-                # Get physical state with default if missing
-                physical_state = data.get('physical_state', 'ok')
-                if physical_state in physical_stats:
-                    physical_stats[physical_state] += 1
-                    
-            # Determine predominant physical state
-            predominant_physical = 'ok'  # Default
-            max_count = physical_stats['ok']  # Start with 'ok' as baseline
-            
-            for state, count in physical_stats.items():
-                if count > max_count:
-                    max_count = count
-                    predominant_physical = state
-                    
             # Return analyzed feedback for adaptation
             return {
                 'emotional_state': 'not_fun' if emotional_negative > (len(recent) // 2) else 'good',
@@ -823,7 +1393,7 @@ class Database:
             }
             
         except Exception as e:
-            logger.error(f"Error getting recent feedback: {e}", exc_info=True)
+            logger.error("Error getting recent feedback: %s", e, exc_info=True)
             # Return default values on error
             return {
                 'emotional_state': 'good',
@@ -834,59 +1404,21 @@ class Database:
     def get_workouts_by_date(self, user_id, start_date, end_date):
         """Get workouts within date range"""
         user_progress = self.get_user_progress(user_id)
-        result = []
-        
-        for workout in user_progress:
-            try:
-                date_str = workout['date']
-                workout_date = None
-                
-                # Try parsing with different formats
-                formats_to_try = [
-                    '%Y-%m-%d %H:%M:%S',  # Format with time
-                    '%Y-%m-%d',           # Format without time
-                    '%d-%m-%Y',           # Alternative format
-                    '%Y-%m-%d %H:%M',     # Format with hours and minutes only
-                ]
-                
-                for date_format in formats_to_try:
-                    try:
-                        if ' ' in date_str and '%H' not in date_format:
-                            # Skip date-only formats for strings with time
-                            continue
-                        workout_date = datetime.strptime(date_str, date_format).date()
-                        break  # Stop trying formats if one succeeds
-                    except ValueError:
-                        continue
-                
-                # If all formats failed, try extracting just the date part
-                if workout_date is None and ' ' in date_str:
-                    date_part = date_str.split(' ')[0]
-                    try:
-                        workout_date = datetime.strptime(date_part, '%Y-%m-%d').date()
-                    except ValueError:
-                        logger.error(f"Failed to parse date '{date_str}' in any format")
-                        continue
-                
-                if not workout_date:
-                    logger.error(f"Failed to parse date '{date_str}' in any format")
-                    continue
-                    
-                if start_date <= workout_date <= end_date:
-                    result.append(workout)
-            except Exception as e:
-                logger.error(f"Error processing workout in get_workouts_by_date: {str(e)}", exc_info=True)
-                    
-        return result
+        start_ord = start_date.toordinal()
+        end_ord = end_date.toordinal()
+        ordinal = self._logged_date_ordinal
+        return [
+            workout for workout in user_progress
+            if (workout_ord := ordinal(workout)) is not None and start_ord <= workout_ord <= end_ord
+        ]
 
     def set_reminder(self, user_id, time):
         """Set workout reminder"""
         if self.use_dynamo:
             self.reminders_table.put_item(Item={'user_id': str(user_id), 'reminder_time': time})
         else:
-            reminders = self._read_json(self.reminders_file)
-            reminders[str(user_id)] = time
-            self._write_json(self.reminders_file, reminders)
+            self.reminders[str(user_id)] = time
+            self._append_delta(self.reminders_file, str(user_id), time)
 
     def get_reminder(self, user_id):
         """Get user's reminder time"""
@@ -896,8 +1428,20 @@ class Database:
             )
             return response.get('Item', {}).get('reminder_time')
         else:
-            reminders = self._read_json(self.reminders_file)
-            return reminders.get(str(user_id))
+            return self.reminders.get(str(user_id))
+
+    def _migrate_json_snapshots(self, collection_files):
+        """Convert existing JSON collections (snapshot plus log) to the configured snapshot format"""
+        for file_path in collection_files:
+            json_path = os.path.splitext(file_path)[0] + '.json'
+            if os.path.exists(file_path) or not os.path.exists(json_path):
+                continue
+            data = self._read_json(json_path)
+            self._write_json(file_path, data)
+            # The in-memory maps are loaded next and annotated in place; make
+            # them parse the new file rather than share the cached objects
+            self._snapshot_cache.pop(file_path, None)
+            logger.info("Migrated %s to %s", json_path, file_path)
 
     def _ensure_files_exist(self):
         """Ensure all required JSON files exist and are properly initialized"""
@@ -915,33 +1459,212 @@ class Database:
                 os.makedirs(os.path.dirname(file), exist_ok=True)
                 # Initialize file with empty dictionary
                 self._write_json(file, {})
-                logger.info(f"Created and initialized {file}")
-            else:
-                # Verify file is valid JSON
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        json.load(f)
-                except json.JSONDecodeError:
-                    logger.warning(f"Invalid JSON in {file}, reinitializing with empty dictionary")
-                    self._write_json(file, {})
+                logger.info("Created and initialized %s", file)
+            elif not _snapshot_looks_valid(file):
+                logger.warning("Invalid snapshot in %s, reinitializing with empty dictionary", file)
+                self._write_json(file, {})
 
     def _read_json(self, file_path):
+        """Load a collection snapshot and replay its append log on top of it"""
+        # Reuse the snapshot we last wrote unless the file has changed since
+        cached = self._snapshot_cache.get(file_path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+            mtime = os.stat(file_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if cached is not None and cached[0] == mtime:
+            data = dict(cached[1])
+        else:
+            try:
+                with open(file_path, 'rb') as f:
+                    data = _unpack_snapshot(file_path, f.read())
+            except (ValueError, FileNotFoundError):
+                data = {}
+
+        log_path = self._log_paths.get(file_path, file_path + '.log')
+        owned = set()
+        # progress_ids already in each list before its appends, by key; a crash
+        # between compaction's snapshot rename and log truncate leaves appends
+        # in the log that the snapshot already holds
+        base_ids = {}
+        try:
+            with open(log_path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = _json_loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-append
+                        logger.warning("Skipping corrupt record in %s", log_path)
+                        continue
+                    key = record['k']
+                    if 'v' in record:
+                        data[key] = record['v']
+                        owned.add(key)
+                        base_ids.pop(key, None)
+                    elif 'a' in record or 'm' in record:
+                        # Values may be shared with the cached snapshot; copy
+                        # once before changing them in place
+                        if key not in owned:
+                            data[key] = data[key].copy() if key in data else ([] if 'a' in record else {})
+                            owned.add(key)
+                        if 'a' in record:
+                            seen = base_ids.get(key)
+                            if seen is None:
+                                seen = base_ids[key] = _progress_ids(data[key])
+                            data[key].extend(
+                                entry for entry in record['a']
+                                if not (isinstance(entry, dict) and entry.get('progress_id') in seen)
+                            )
+                        else:
+                            for entry_key, entry in record['m'].items():
+                                data[key].pop(entry_key, None)
+                                data[key][entry_key] = entry
+                    else:
+                        data.pop(key, None)
+                        owned.discard(key)
+                        base_ids.pop(key, None)
+        except FileNotFoundError:
+            pass
+        return data
     
     def _write_json(self, file_path, data):
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Write a snapshot atomically: dump to a temp file, then rename over the target"""
+        tmp_path = self._tmp_paths[file_path]
+        with open(tmp_path, 'wb', buffering=WAL_BUFFER_SIZE) as f:
+            f.write(_pack_snapshot(file_path, data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        self._snapshot_cache[file_path] = (os.stat(file_path).st_mtime_ns, dict(data))
+
+    def _file_signature(self, file_path):
+        """Return (mtime_ns, size) of a collection's snapshot and log, None for missing files"""
+        sig = []
+        for path in (file_path, self._log_paths[file_path]):
+            try:
+                st = os.stat(path)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _reload_users_if_changed(self):
+        """Reload users from disk if another process has written them since our last load or write"""
+        if self._file_signature(self.users_file) == self._file_sigs.get(self.users_file):
+            return
+        # Our own queued appends also change the files; let them land first
+        self.flush()
+        sig = self._file_signature(self.users_file)
+        if sig == self._file_sigs.get(self.users_file):
+            return
+        self.users = self._read_json(self.users_file)
+        self._file_sigs[self.users_file] = sig
+        with self._cache_lock:
+            self._profile_cache.clear()
+            self._subscription_cache.clear()
+        logger.info("Reloaded %s after an external change", self.users_file)
+
+    def _append_delta(self, file_path, key, value=None, delete=False, op="v"):
+        """Queue a single key update (or deletion) for the collection's log.
+
+        op "v" replaces the value, "a" extends a list value and "m" re-inserts
+        dict entries, so growing per-user collections log only what changed.
+        """
+        record = {"k": key} if delete else {"k": key, op: value}
+        # Encode on the caller's thread so the record reflects the state at save time
+        self._write_q.put((file_path, _json_line(record)))
+
+    def flush(self):
+        """Block until every queued log append has been written to disk"""
+        self._write_q.join()
+
+    def close(self):
+        """Flush pending appends and close the log descriptors"""
+        self.flush()
+        for fd in self._wal_fds.values():
+            _datasync(fd)
+            os.close(fd)
+        self._wal_fds = {}
+
+    def _writer_loop(self):
+        """Drain the write queue, writing whatever has piled up with one call per log"""
+        while True:
+            batch = [self._write_q.get()]
+            while True:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                pending = {}
+                for file_path, line in batch:
+                    pending.setdefault(file_path, []).append(line)
+                for file_path, lines in pending.items():
+                    self._write_lines(file_path, lines)
+            except Exception as e:
+                logger.error("Error writing database log: %s", e, exc_info=True)
+            finally:
+                for _ in batch:
+                    self._write_q.task_done()
+
+    def _write_lines(self, file_path, lines):
+        """Append encoded records to a collection log, compacting when it grows too long.
+
+        The log is locked for the append and any compaction, so another
+        instance's appends can't land between compaction's read and truncate.
+        """
+        fd = self._wal_fds[file_path]
+        with _log_lock(self._log_paths[file_path]):
+            if fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                self._write_lines_locked(file_path, fd, lines)
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(fd, fcntl.LOCK_UN)
+
+    def _write_lines_locked(self, file_path, fd, lines):
+        """Body of _write_lines; the caller holds the log locks"""
+        # Only take the new signature as our own if nobody else had written
+        # since we last looked; otherwise leave it stale so the next read reloads
+        in_sync = self._file_signature(file_path) == self._file_sigs.get(file_path)
+        written = 0
+        if _writev is not None and len(lines) <= _IOV_MAX:
+            # Gather write straight from the encoded records, no join copy
+            written = _writev(fd, lines)
+        if written < sum(map(len, lines)):
+            data = memoryview(b"".join(lines))[written:]
+            while data:
+                data = data[os.write(fd, data):]
+
+        count = self._wal_counts.get(file_path, 0) + len(lines)
+        self._wal_counts[file_path] = count
+        unsynced = self._unsynced.get(file_path, 0) + len(lines)
+        if unsynced >= WAL_FSYNC_EVERY:
+            _datasync(fd)
+            unsynced = 0
+        self._unsynced[file_path] = unsynced
+        if count >= WAL_COMPACT_EVERY:
+            self._compact(file_path)
+        self._file_sigs[file_path] = self._file_signature(file_path) if in_sync else None
+
+    def _compact(self, file_path):
+        """Fold the append log into the snapshot and truncate the log"""
+        data = self._read_json(file_path)
+        self._write_json(file_path, data)
+        os.ftruncate(self._wal_fds[file_path], 0)
+        self._wal_counts[file_path] = 0
+        self._unsynced[file_path] = 0
+        logger.info("Compacted %s", file_path)
 
     def get_detailed_progress_stats(self, user_id, days=30):
         """Get detailed progress statistics"""
         user_id = str(user_id)
-        workouts = self.get_user_progress(user_id)
+        arrays = self._progress_arrays(user_id)
+        total_workouts = arrays['workouts']
 
-        if not workouts:
+        if not total_workouts:
             return {
                 "total_workouts": 0,
                 "completion_rate": 0,
@@ -950,93 +1673,72 @@ class Database:
                 "monthly_stats": {}
             }
 
-        # Calculate date ranges
-        today = datetime.now().date()
-        start_date = today - timedelta(days=days)
-
-        # Initialize stats
-        total_workouts = len(workouts)
-        completed_workouts = sum(1 for w in workouts if w.get('workout_completed', False))
-        completion_rate = int((completed_workouts / total_workouts * 100) if total_workouts > 0 else 0)
-
-        # Get streak information
-        streaks = self.get_workout_streak(user_id)
-
-        # Weekly and monthly stats
-        weekly_stats = defaultdict(lambda: {"workouts": 0, "completed": 0, "completion_rate": 0})
-        monthly_stats = defaultdict(lambda: {"workouts": 0, "completed": 0, "completion_rate": 0})
-
-        for workout in workouts:
-            try:
-                date_str = workout['date']
-                workout_date = None
-                
-                # Try parsing with different formats
-                formats_to_try = [
-                    '%Y-%m-%d %H:%M:%S',  # Format with time
-                    '%Y-%m-%d',           # Format without time
-                    '%d-%m-%Y',           # Alternative format
-                    '%Y-%m-%d %H:%M',     # Format with hours and minutes only
-                ]
-                
-                for date_format in formats_to_try:
-                    try:
-                        if ' ' in date_str and '%H' not in date_format:
-                            # Skip date-only formats for strings with time
-                            continue
-                        workout_date = datetime.strptime(date_str, date_format).date()
-                        break  # Stop trying formats if one succeeds
-                    except ValueError:
-                        continue
-                
-                # If all formats failed, try extracting just the date part
-                if workout_date is None and ' ' in date_str:
-                    date_part = date_str.split(' ')[0]
-                    try:
-                        workout_date = datetime.strptime(date_part, '%Y-%m-%d').date()
-                    except ValueError:
-                        logger.error(f"Failed to parse date '{date_str}' in any format")
-                        continue
-                
-                if not workout_date:
-                    logger.error(f"Failed to parse date '{date_str}' in any format")
-                    continue
-                
-                if workout_date >= start_date:
-                    # Weekly stats
-                    week = workout_date.isocalendar()[1]  # Get week number
-                    week_key = f"Week {week}"
-                    weekly_stats[week_key]["workouts"] += 1
-                    if workout.get('workout_completed', False):
-                        weekly_stats[week_key]["completed"] += 1
-
-                    # Monthly stats
-                    month_key = workout_date.strftime('%B %Y')  # Month name and year
-                    monthly_stats[month_key]["workouts"] += 1
-                    if workout.get('workout_completed', False):
-                        monthly_stats[month_key]["completed"] += 1
-            except Exception as e:
-                logger.error(f"Error processing workout for progress stats: {str(e)}", exc_info=True)
-
-        # Calculate completion rates for each period
-        for stats in weekly_stats.values():
-            stats["completion_rate"] = int((stats["completed"] / stats["workouts"] * 100) if stats["workouts"] > 0 else 0)
+        completed_workouts = arrays['workouts_done']
+        completion_rate = int(completed_workouts / total_workouts * 100)
 
-        for stats in monthly_stats.values():
-            stats["completion_rate"] = int((stats["completed"] / stats["workouts"] * 100) if stats["workouts"] > 0 else 0)
+        # Get streak information; file storage keeps a sorted date index
+        workout_days = arrays['days']
+        if not self.use_dynamo:
+            streaks = self._streaks_from_dates(self._date_index.get(user_id, ()))
+        elif workout_days.size:
+            streaks = self._streaks_from_ordinals(np.unique(workout_days))
+        else:
+            streaks = self._streaks_from_dates(())
+
+        # Count workouts and completions per day in the window, then fold the
+        # (at most days + 1) distinct days into weekly and monthly
+        # [workouts, completed] counters
+        start_ord = (datetime.now().date() - timedelta(days=days)).toordinal()
+        mask = workout_days >= start_ord
+        days_in_window, inverse = np.unique(workout_days[mask], return_inverse=True)
+        day_workouts = np.bincount(inverse, minlength=days_in_window.size)
+        day_done = np.bincount(inverse, weights=arrays['done'][mask], minlength=days_in_window.size)
+
+        weekly_stats = {}
+        monthly_stats = {}
+        for day, workouts, completed in zip(days_in_window.tolist(), day_workouts.tolist(), day_done.tolist()):
+            workout_date = date.fromordinal(day)
+            completed = int(completed)
+
+            week_key = 'Week ' + str(workout_date.isocalendar()[1])
+            week_stats = weekly_stats.get(week_key)
+            if week_stats is None:
+                week_stats = weekly_stats[week_key] = [0, 0]
+            week_stats[0] += workouts
+            week_stats[1] += completed
+
+            month_key = _MONTH_NAMES[workout_date.month - 1] + ' ' + str(workout_date.year)
+            month_stats = monthly_stats.get(month_key)
+            if month_stats is None:
+                month_stats = monthly_stats[month_key] = [0, 0]
+            month_stats[0] += workouts
+            month_stats[1] += completed
+
+        # Materialize the [workouts, completed] counters with their completion rates
+        weekly_stats = {key: _period_stats(*counts) for key, counts in weekly_stats.items()}
+        monthly_stats = {key: _period_stats(*counts) for key, counts in monthly_stats.items()}
 
         return {
             "total_workouts": total_workouts,
             "completed_workouts": completed_workouts,
             "completion_rate": completion_rate,
             "streaks": streaks,
-            "weekly_stats": dict(weekly_stats),
-            "monthly_stats": dict(monthly_stats)
+            "weekly_stats": weekly_stats,
+            "monthly_stats": monthly_stats
         }
 
     def save_subscription(self, user_id, subscription_data):
         """Save user subscription data"""
         user_id = str(user_id)
+        self._invalidate_user_cache(user_id)
+
+        # Store the expiry as epoch seconds too so status checks skip strptime
+        if subscription_data.get('expiry_date'):
+            expiry_epoch = _expiry_epoch(subscription_data['expiry_date'])
+            if expiry_epoch is not None:
+                subscription_data['expiry_epoch'] = expiry_epoch
+            else:
+                logger.warning("Unparseable subscription expiry date for user %s: %s", user_id, subscription_data['expiry_date'])
         
         if self.use_dynamo:
             try:
@@ -1047,7 +1749,7 @@ class Database:
                 profile = response.get('Item', {})
                 
                 if not profile:
-                    logger.warning(f"No user profile found for user {user_id} when saving subscription")
+                    logger.warning("No user profile found for user %s when saving subscription", user_id)
                     return False
                 
                 # Update with subscription data
@@ -1056,88 +1758,103 @@ class Database:
                 # Prepare for DynamoDB and save
                 dynamo_profile = self._prepare_for_dynamo(profile)
                 self.users_table.put_item(Item=dynamo_profile)
-                logger.info(f"Saved subscription for user {user_id} to DynamoDB")
+                logger.info("Saved subscription for user %s to DynamoDB", user_id)
                 return True
             except Exception as e:
-                logger.error(f"Error saving subscription to DynamoDB: {str(e)}")
+                logger.error("Error saving subscription to DynamoDB: %s", e)
                 return False
         else:
-            # Load users from file if not already loaded
-            if not hasattr(self, 'users'):
-                self.users = self._read_json(self.users_file)
+            self._reload_users_if_changed()
                 
             if user_id not in self.users:
-                logger.warning(f"No user profile found for user {user_id} when saving subscription")
+                logger.warning("No user profile found for user %s when saving subscription", user_id)
                 return False
 
             self.users[user_id]['subscription'] = subscription_data
-            self._write_json(self.users_file, self.users)
-            logger.info(f"Saved subscription for user {user_id} to file")
+            self._append_delta(self.users_file, user_id, self.users[user_id])
+            logger.info("Saved subscription for user %s to file", user_id)
             return True
 
+    def _subscription_entry(self, user_id):
+        """Return (subscription, access_until) for a user, cached per user.
+
+        access_until is the epoch second until which the user may use the bot
+        (inf for premium or unrestricted users), or None if the user is unknown.
+        """
+        if not self.use_dynamo:
+            # Another instance's write clears the cache through the reload
+            self._reload_users_if_changed()
+        with self._cache_lock:
+            entry = self._subscription_cache.get(user_id)
+        if entry is not None:
+            return entry
+
+        # Get user data differently depending on storage method
+        if self.use_dynamo:
+            # Only the subscription is needed; user_id is projected too so that
+            # a user without one still comes back as a non-empty item
+            response = self.users_table.get_item(
+                Key={'user_id': user_id},
+                ProjectionExpression='user_id, subscription',
+            )
+            user = response.get('Item', {})
+        else:
+            user = self.users.get(user_id, {})
+
+        subscription = user.get('subscription')
+        sub = subscription or {}
+        if not user:
+            access_until = None
+        elif sub.get('premium', False):
+            # Whitelisted users with premium access
+            access_until = float('inf')
+        elif sub.get('active', False):
+            expiry_epoch = sub.get('expiry_epoch')
+            if expiry_epoch is None:
+                # Records saved before expiry_epoch existed and not yet backfilled
+                expiry_epoch = datetime.strptime(sub.get('expiry_date', '2000-01-01'), '%Y-%m-%d').timestamp()
+            access_until = int(expiry_epoch)
+        else:
+            access_until = float('inf')  # For now, allow all users (no subscription requirement)
+
+        entry = (subscription, access_until)
+        with self._cache_lock:
+            self._subscription_cache[user_id] = entry
+        return entry
+
     def get_subscription(self, user_id):
         """Get user subscription data"""
         user_id = str(user_id)
         
-        if self.use_dynamo:
-            try:
-                response = self.users_table.get_item(
-                    Key={'user_id': user_id}
-                )
-                user = response.get('Item', {})
-            except Exception as e:
-                logger.error(f"Error retrieving user from DynamoDB: {str(e)}")
-                user = {}
-        else:
-            if not hasattr(self, 'users'):
-                self.users = self._read_json(self.users_file)
-            user = self.users.get(user_id, {})
+        try:
+            subscription, _ = self._subscription_entry(user_id)
+        except Exception as e:
+            logger.error("Error retrieving user from DynamoDB: %s", e)
+            return None
             
-        return user.get('subscription')
+        return subscription
 
     def check_subscription_status(self, user_id):
         """Check if user has active subscription or is within trial period"""
         user_id = str(user_id)
         
-        # Get user data differently depending on storage method
-        if self.use_dynamo:
-            try:
-                response = self.users_table.get_item(
-                    Key={'user_id': user_id}
-                )
-                user = response.get('Item', {})
-            except Exception as e:
-                logger.error(f"Error retrieving user from DynamoDB: {str(e)}")
-                return False
-        else:
-            if not hasattr(self, 'users'):
-                self.users = self._read_json(self.users_file)
-            user = self.users.get(user_id, {})
+        try:
+            _, access_until = self._subscription_entry(user_id)
+        except Exception as e:
+            logger.error("Error retrieving user from DynamoDB: %s", e)
+            return False
 
-        if not user:
-            logger.warning(f"User {user_id} not found in database during subscription check")
+        if access_until is None:
+            logger.warning("User %s not found in database during subscription check", user_id)
             return False
 
-        subscription = user.get('subscription', {})
-        
-        # Check whitelist status (users with premium access)
-        if subscription.get('premium', False):
-            logger.info(f"User {user_id} has premium access - bypassing subscription check")
-            return True
-            
-        if subscription.get('active', False):
-            # Check if subscription is still valid
-            expiry_date = datetime.strptime(subscription.get('expiry_date', '2000-01-01'), '%Y-%m-%d')
-            is_valid = datetime.now() <= expiry_date
-            logger.info(f"User {user_id} subscription valid: {is_valid}, expires: {expiry_date}")
-            return is_valid
-            
-        return True  # For now, allow all users (no subscription requirement)
+        return time.time() <= access_until
         
     def add_premium_status(self, user_id):
         """Add premium access to user subscription"""
         user_id = str(user_id)
-        logger.info(f"Attempting to add premium status to user {user_id}")
+        self._invalidate_user_cache(user_id)
+        logger.info("Attempting to add premium status to user %s", user_id)
         
         if self.use_dynamo:
             try:
@@ -1148,7 +1865,7 @@ class Database:
                 profile = response.get('Item', {})
                 
                 if not profile:
-                    logger.warning(f"No user profile found for user {user_id} when adding premium access")
+                    logger.warning("No user profile found for user %s when adding premium access", user_id)
                     return False
                 
                 # Update or create subscription data
@@ -1160,48 +1877,44 @@ class Database:
                 # Prepare for DynamoDB and save
                 dynamo_profile = self._prepare_for_dynamo(profile)
                 self.users_table.put_item(Item=dynamo_profile)
-                logger.info(f"User {user_id} granted premium access in DynamoDB")
+                logger.info("User %s granted premium access in DynamoDB", user_id)
                 return True
             except Exception as e:
-                logger.error(f"Error adding premium status to DynamoDB: {str(e)}")
+                logger.error("Error adding premium status to DynamoDB: %s", e)
                 return False
         else:
-            # Load users from file if not already loaded
-            if not hasattr(self, 'users'):
-                self.users = self._read_json(self.users_file)
+            self._reload_users_if_changed()
                 
             if user_id not in self.users:
-                logger.warning(f"No user profile found for user {user_id} when adding premium access")
+                logger.warning("No user profile found for user %s when adding premium access", user_id)
                 return False
                 
             if 'subscription' not in self.users[user_id]:
-                logger.info(f"Creating new subscription entry for user {user_id}")
+                logger.info("Creating new subscription entry for user %s", user_id)
                 self.users[user_id]['subscription'] = {}
                 
-            logger.info(f"Setting premium=True for user {user_id}")
+            logger.info("Setting premium=True for user %s", user_id)
             self.users[user_id]['subscription']['premium'] = True
             
             # Log user data before saving
-            logger.info(f"User data before save: {self.users[user_id]}")
+            logger.debug("User data before save: %s", self.users[user_id])
             
             try:
-                self._write_json(self.users_file, self.users)
-                logger.info(f"User {user_id} granted premium access - save successful")
-                
-                # Double-check that premium status was actually saved
-                reloaded_user = self._read_json(self.users_file).get(user_id, {})
-                reloaded_premium = reloaded_user.get('subscription', {}).get('premium', False)
-                logger.info(f"Verified premium status for user {user_id}: {reloaded_premium}")
-                
+                self._append_delta(self.users_file, user_id, self.users[user_id])
+                logger.info("User %s granted premium access - save successful", user_id)
+
+                # Make the grant visible to other processes before reporting success
+                self.flush()
                 return True
             except Exception as e:
-                logger.error(f"Error saving premium status: {e}")
+                logger.error("Error saving premium status: %s", e)
                 return False
         
     def remove_premium_status(self, user_id):
         """Remove premium access from user subscription"""
         user_id = str(user_id)
-        logger.info(f"Attempting to remove premium status from user {user_id}")
+        self._invalidate_user_cache(user_id)
+        logger.info("Attempting to remove premium status from user %s", user_id)
         
         if self.use_dynamo:
             try:
@@ -1212,7 +1925,7 @@ class Database:
                 profile = response.get('Item', {})
                 
                 if not profile or 'subscription' not in profile:
-                    logger.warning(f"No user profile or subscription found for user {user_id} when removing premium access")
+                    logger.warning("No user profile or subscription found for user %s when removing premium access", user_id)
                     return False
                 
                 profile['subscription']['premium'] = False
@@ -1220,55 +1933,78 @@ class Database:
                 # Prepare for DynamoDB and save
                 dynamo_profile = self._prepare_for_dynamo(profile)
                 self.users_table.put_item(Item=dynamo_profile)
-                logger.info(f"Premium access removed for user {user_id} in DynamoDB")
+                logger.info("Premium access removed for user %s in DynamoDB", user_id)
                 return True
             except Exception as e:
-                logger.error(f"Error removing premium status from DynamoDB: {str(e)}")
+                logger.error("Error removing premium status from DynamoDB: %s", e)
                 return False
         else:
-            # Load users from file if not already loaded
-            if not hasattr(self, 'users'):
-                self.users = self._read_json(self.users_file)
+            self._reload_users_if_changed()
             
             if user_id not in self.users or 'subscription' not in self.users[user_id]:
-                logger.warning(f"No user profile or subscription found for user {user_id} when removing premium access")
+                logger.warning("No user profile or subscription found for user %s when removing premium access", user_id)
                 return False
                 
-            logger.info(f"Setting premium=False for user {user_id}")
+            logger.info("Setting premium=False for user %s", user_id)
             self.users[user_id]['subscription']['premium'] = False
             
             try:
-                self._write_json(self.users_file, self.users)
-                logger.info(f"Premium access removed for user {user_id} - save successful")
+                self._append_delta(self.users_file, user_id, self.users[user_id])
+                logger.info("Premium access removed for user %s - save successful", user_id)
                 return True
             except Exception as e:
-                logger.error(f"Error removing premium status: {e}")
+                logger.error("Error removing premium status: %s", e)
                 return False
 
     def migrate_data_to_dynamo(self):
         """Migrate all data from JSON files to DynamoDB"""
+        # batch_writer groups puts into 25-item BatchWriteItem calls and resends
+        # unprocessed items. Items go through _prepare_for_dynamo because one
+        # float would fail a whole batch. The writes are network-bound, so
+        # chunks of each table are written concurrently.
+        jobs = []
+
         # Migrate users
         users = self._read_json(self.users_file)
+        items = []
         for user_id, profile in users.items():
             profile_copy = profile.copy()
             profile_copy['user_id'] = user_id
-            self.users_table.put_item(Item=profile_copy)
+            items.append(self._prepare_for_dynamo(profile_copy))
+        jobs.append((self.users_table.name, items))
         
         # Migrate active workouts
         workouts = self._read_json(self.active_workouts_file)
+        items = []
         for user_id, workout in workouts.items():
             workout_copy = workout.copy()
             workout_copy['user_id'] = user_id
-            self.workouts_table.put_item(Item=workout_copy)
+            items.append(self._prepare_for_dynamo(workout_copy))
+        jobs.append((self.workouts_table.name, items))
         
-        # Migrate progress (requires restructuring)
+        # Migrate progress (requires restructuring); a workout saved twice
+        # shares a progress_id, and with chunks written in any order the
+        # last entry must win before the items are split up
         progress = self._read_json(self.progress_file)
+        timestamp = int(time.time())
+        by_key = {}
         for user_id, entries in progress.items():
             for entry in entries:
                 entry_copy = entry.copy()
                 entry_copy['user_id'] = user_id
                 entry_copy['progress_id'] = f"{user_id}_{entry['workout_id']}"
-                entry_copy['timestamp'] = int(time.time())
-                self.progress_table.put_item(Item=entry_copy)
+                entry_copy['timestamp'] = timestamp
+                by_key[user_id, entry_copy['progress_id']] = self._prepare_for_dynamo(entry_copy)
+        jobs.append((self.progress_table.name, list(by_key.values())))
+
+        with ThreadPoolExecutor(max_workers=MIGRATE_WORKERS, thread_name_prefix='db-migrate') as pool:
+            futures = {
+                pool.submit(_migrate_chunk, table_name, items[start:start + MIGRATE_CHUNK_SIZE]): table_name
+                for table_name, items in jobs
+                for start in range(0, len(items), MIGRATE_CHUNK_SIZE)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                logger.info("Migrated %d items to %s (%d/%d chunks)",
+                            future.result(), futures[future], done, len(futures))
         
         # ... migrate other data ...
\ No newline at end of file
@@ -1,5 +1,7 @@
 import asyncio
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, Message
+import functools
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, Message, InputMediaAnimation
+from telegram.error import BadRequest
 from telegram.ext import (
     ContextTypes, CommandHandler, CallbackQueryHandler, ConversationHandler,
     MessageHandler, filters, TypeHandler, PreCheckoutQueryHandler
@@ -24,6 +26,107 @@ logger = logging.getLogger(__name__)
 # Email validation regex
 EMAIL_REGEX = re.compile(r"[^@]+@[^@]+\.[^@]+")
 
+# Remaining seconds at which running timers edit their message; every edit
+# counts against the bot-wide Telegram rate limit
+TIMER_CHECKPOINTS = (60, 30, 10, 5)
+
+
+def _timer_checkpoints(duration):
+    """Remaining-time marks for a timer of `duration` seconds, ending with 0 (done)"""
+    return [t for t in TIMER_CHECKPOINTS if t < duration] + [0]
+
+
+@functools.lru_cache(maxsize=128)
+def _format_rest(seconds):
+    """Rest time as 'N сек', or 'M мин N сек' from a minute up"""
+    if seconds >= 60:
+        return f"{seconds // 60} мин {seconds % 60} сек"
+    return f"{seconds} сек"
+
+
+# "How to" blocks of the exercise view: circuit (bodyweight) or set (gym)
+# exercises, done against the exercise timer or by reps
+_TIMER_STEPS = (
+    "\n\n📋 Как выполнять:"
+    "\n1️⃣ Нажмите кнопку '⏱ Старт упражнения' чтобы начать таймер"
+    "\n2️⃣ Выполняйте упражнение пока идет таймер"
+)
+CIRCUIT_TIMED_INSTRUCTIONS = (
+    _TIMER_STEPS +
+    "\n3️⃣ После сигнала таймера нажмите '✅ Упражнение выполнено'"
+    "\n3️⃣ Отдохните, нажав кнопку таймера"
+    "\n4️⃣ После последнего упражнения - отдохните перед следующим кругом"
+)
+CIRCUIT_REPS_INSTRUCTIONS = (
+    "\n\n📋 Как выполнять:"
+    "\n1️⃣ Выполните упражнение указанное количество раз"
+    "\n2️⃣ Нажмите '✅ Упражнение выполнено'"
+    "\n3️⃣ Отдохните, нажав кнопку таймера"
+    "\n4️⃣ После последнего упражнения - отдохните перед следующим кругом"
+)
+SET_TIMED_INSTRUCTIONS = (
+    _TIMER_STEPS +
+    "\n3️⃣ После сигнала таймера нажмите '✅ Сет выполнен'"
+    "\n3️⃣ Отдохните, нажав кнопку таймера"
+)
+SET_REPS_INSTRUCTIONS = (
+    "\n\n📋 Как выполнять:"
+    "\n1️⃣ Выполните указанное количество повторений с заданным весом"
+    "\n2️⃣ Нажмите '✅ Сет выполнен'"
+    "\n3️⃣ Отдохните, нажав кнопку таймера"
+)
+
+
+def _gym_groups_markup(prefix, all_groups=True):
+    """Muscle-group picker whose buttons send '<prefix>_<group>' callbacks"""
+    keyboard = [
+        [
+            InlineKeyboardButton("Грудь + Бицепс", callback_data=f"{prefix}_грудь_бицепс"),
+            InlineKeyboardButton("Спина + Трицепс", callback_data=f"{prefix}_спина_трицепс")
+        ],
+        [InlineKeyboardButton("Ноги", callback_data=f"{prefix}_ноги")]
+    ]
+    if all_groups:
+        keyboard.append([InlineKeyboardButton("Тренировка на все группы мышц", callback_data=f"{prefix}_все_группы")])
+    return InlineKeyboardMarkup(keyboard)
+
+
+# Keyboards that never change; Telegram objects are immutable, so one
+# instance is shared by every reply
+MUSCLE_GROUP_MARKUP = _gym_groups_markup("muscle")
+MUSCLE_GROUP_SPLIT_MARKUP = _gym_groups_markup("muscle", all_groups=False)
+PREVIEW_GROUP_MARKUP = _gym_groups_markup("preview")
+DASHBOARD_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("📈 Прогресс по неделям", callback_data="progress_weekly"),
+        InlineKeyboardButton("📅 Месячный отчет", callback_data="progress_monthly")
+    ],
+    [
+        InlineKeyboardButton("🏆 Достижения", callback_data="achievements"),
+        InlineKeyboardButton("📋 История", callback_data="workout_history")
+    ],
+    [
+        InlineKeyboardButton("💪 Анализ интенсивности", callback_data="intensity_analysis")
+    ]
+])
+BACK_TO_DASHBOARD_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("Назад к дашборду", callback_data="back_to_dashboard")]])
+UPDATE_PROFILE_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("🔄 Обновить профиль", callback_data="update_profile_full")]])
+REPLACE_PROFILE_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("✅ Да, обновить все поля", callback_data="update_profile_full")],
+    [InlineKeyboardButton("❌ Нет, оставить текущий", callback_data="keep_profile")]
+])
+FEEDBACK_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("👍 Понравилось", callback_data="feedback_fun"),
+        InlineKeyboardButton("👎 Не понравилось", callback_data="feedback_not_fun")
+    ],
+    [
+        InlineKeyboardButton("😅 Было легко", callback_data="feedback_too_easy"),
+        InlineKeyboardButton("😊 Нормально", callback_data="feedback_ok"),
+        InlineKeyboardButton("😓 Устал(а)", callback_data="feedback_tired")
+    ]
+])
+
 class BotHandlers:
     def __init__(self, database, workout_manager, reminder_manager):
         self.db = database
@@ -46,6 +149,16 @@ class BotHandlers:
         # so we pass the database object directly
         self.payment_manager = PaymentManager(database)  # Keep using 'database' to match PaymentManager's expectation
 
+    async def _db_call(self, method, *args, **kwargs):
+        """Call a Database method without stalling the event loop.
+
+        DynamoDB calls block on the network, so they run in a worker thread;
+        file storage works on in-memory data and is called directly.
+        """
+        if self.db.use_dynamo:
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return method(*args, **kwargs)
+
     async def show_progress(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle the /progress command - show fitness dashboard"""
         try:
@@ -58,42 +171,27 @@ class BotHandlers:
                 message_obj = update.message
 
             # Get detailed statistics
-            stats = self.db.get_detailed_progress_stats(user_id)
-            logger.info(f"Retrieved initial stats for dashboard: {stats}")
+            stats = await self._db_call(self.db.get_detailed_progress_stats, user_id)
+            logger.debug("Retrieved initial stats for dashboard: %s", stats)
 
             streaks = stats.get('streaks', {})
             current_streak = streaks.get('current_streak', 0)
             longest_streak = streaks.get('longest_streak', 0)
 
-            # Format main dashboard message
-            message = "🏋️‍♂️ *Фитнес Дашборд*\n\n"
-
-            # Overall Statistics
-            message += "*📊 Общая статистика*\n"
-            message += f"• Всего тренировок: {stats.get('total_workouts', 0)}\n"
-            message += f"• Завершено полностью: {stats.get('completed_workouts', 0)}\n"
-            message += f"• Процент завершения: {stats.get('completion_rate', 0)}%\n\n"
-
-            # Streaks
-            message += "*🔥 Серии тренировок*\n"
-            message += f"• Текущая серия: {current_streak} дней\n"
-            message += f"• Лучшая серия: {longest_streak} дней\n\n"
+            # Format main dashboard message: overall statistics, then streaks
+            message = (
+                "🏋️‍♂️ *Фитнес Дашборд*\n\n"
+                "*📊 Общая статистика*\n"
+                f"• Всего тренировок: {stats.get('total_workouts', 0)}\n"
+                f"• Завершено полностью: {stats.get('completed_workouts', 0)}\n"
+                f"• Процент завершения: {stats.get('completion_rate', 0)}%\n\n"
+                "*🔥 Серии тренировок*\n"
+                f"• Текущая серия: {current_streak} дней\n"
+                f"• Лучшая серия: {longest_streak} дней\n\n"
+            )
 
             # Navigation buttons
-            keyboard = [
-                [
-                    InlineKeyboardButton("📈 Прогресс по неделям", callback_data="progress_weekly"),
-                    InlineKeyboardButton("📅 Месячный отчет", callback_data="progress_monthly")
-                ],
-                [
-                    InlineKeyboardButton("🏆 Достижения", callback_data="achievements"),
-                    InlineKeyboardButton("📋 История", callback_data="workout_history")
-                ],
-                [
-                    InlineKeyboardButton("💪 Анализ интенсивности", callback_data="intensity_analysis")
-                ]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = DASHBOARD_MARKUP
 
             logger.info("Sending main dashboard view")
             try:
@@ -133,10 +231,10 @@ class BotHandlers:
     async def start_gym_workout(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start a gym-specific workout session"""
         user_id = update.effective_user.id
-        profile = self.db.get_user_profile(user_id)
+        profile = await self._db_call(self.db.get_user_profile, user_id)
 
         if not profile:
-            await update.message.reply_text("Сначала создайте профиль командой /profile")
+            await update.message.reply_text(messages.PROFILE_REQUIRED)
             return
 
         equipment = profile.get('equipment', '').lower()
@@ -148,27 +246,25 @@ class BotHandlers:
             return
 
         # Show muscle group selection
-        keyboard = [
-            [
-                InlineKeyboardButton("Грудь + Бицепс", callback_data="muscle_грудь_бицепс"),
-                InlineKeyboardButton("Спина + Трицепс", callback_data="muscle_спина_трицепс")
-            ],
-            [InlineKeyboardButton("Ноги", callback_data="muscle_ноги")],
-            [InlineKeyboardButton("Тренировка на все группы мышц", callback_data="muscle_все_группы")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = MUSCLE_GROUP_MARKUP
         await update.message.reply_text(
             "Выберите группу мышц для тренировки:",
             reply_markup=reply_markup
         )
 
-    async def _show_gym_exercise(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Display current exercise with controls"""
-        user_id = update.effective_user.id if update.callback_query else update.effective_user.id
-        workout = self.db.get_active_workout(user_id)
+    async def _show_gym_exercise(self, update: Update, context: ContextTypes.DEFAULT_TYPE, edit: bool = False, workout=None):
+        """Display current exercise with controls.
+
+        With edit=True the callback's message is replaced in place when possible,
+        otherwise the exercise is sent anew and that message deleted. Callers
+        that already hold the active workout pass it in to skip the reload.
+        """
+        user_id = update.effective_user.id
+        if workout is None:
+            workout = await self._db_call(self.db.get_active_workout, user_id)
 
         if not workout:
-            message = "Тренировка не найдена. Используйте /workout для получения программы."
+            message = messages.WORKOUT_NOT_FOUND
             if update.callback_query:
                 await update.callback_query.message.reply_text(message)
             else:
@@ -186,46 +282,36 @@ class BotHandlers:
             current_circuit = int(workout.get('current_circuit', 1))  # Convert to int
             total_circuits = int(exercise.get('circuits', 3))  # Convert to int
 
-            message = f"💪 Круг {current_circuit}/{total_circuits}\n"
-            message += f"Упражнение {current}/{total}\n\n"
-            message += f"📍 {exercise['name']}\n"
-            message += f"🎯 Целевые мышцы: {exercise['target_muscle']}\n"
-            message += f"⭐ Сложность: {exercise.get('difficulty', 'средний')}\n\n"
-
             # Convert exercise time to int for both display and comparison
             exercise_time = int(exercise.get('time', 0))
             exercise_reps = int(exercise.get('reps', 0))
-            
-            # Check for timed exercise
-            if exercise_time > 0:
-                message += f"⏱ Время: {exercise_time} сек\n"
-            else:
-                message += f"🔄 Повторения: {exercise_reps}\n"
 
             # Format rest times using workout-level circuits rest
             circuits_rest = int(workout['circuits_rest'])  # Convert to int
-            if circuits_rest >= 60:
-                circuits_rest_str = f"{circuits_rest // 60} мин {circuits_rest % 60} сек"
-            else:
-                circuits_rest_str = f"{circuits_rest} сек"
+            circuits_rest_str = _format_rest(circuits_rest)
 
             exercises_rest = int(exercise['exercises_rest'])  # Convert to int
             exercises_rest_str = f"{exercises_rest} сек"
 
-            message += f"\n⏰ Отдых между кругами: {circuits_rest_str}"
-            message += f"\n⏰ Отдых между упражнениями: {exercises_rest_str}"
-
-            # Add instructions
-            message += "\n\n📋 Как выполнять:"
+            # Timed exercises run against the exercise timer
             if exercise_time > 0:
-                message += "\n1️⃣ Нажмите кнопку '⏱ Старт упражнения' чтобы начать таймер"
-                message += "\n2️⃣ Выполняйте упражнение пока идет таймер"
-                message += "\n3️⃣ После сигнала таймера нажмите '✅ Упражнение выполнено'"
+                volume_line = f"⏱ Время: {exercise_time} сек"
+                instructions = CIRCUIT_TIMED_INSTRUCTIONS
             else:
-                message += "\n1️⃣ Выполните упражнение указанное количество раз"
-                message += "\n2️⃣ Нажмите '✅ Упражнение выполнено'"
-            message += "\n3️⃣ Отдохните, нажав кнопку таймера"
-            message += "\n4️⃣ После последнего упражнения - отдохните перед следующим кругом"
+                volume_line = f"🔄 Повторения: {exercise_reps}"
+                instructions = CIRCUIT_REPS_INSTRUCTIONS
+
+            message = (
+                f"💪 Круг {current_circuit}/{total_circuits}\n"
+                f"Упражнение {current}/{total}\n\n"
+                f"📍 {exercise['name']}\n"
+                f"🎯 Целевые мышцы: {exercise['target_muscle']}\n"
+                f"⭐ Сложность: {exercise.get('difficulty', 'средний')}\n\n"
+                f"{volume_line}\n"
+                f"\n⏰ Отдых между кругами: {circuits_rest_str}"
+                f"\n⏰ Отдых между упражнениями: {exercises_rest_str}"
+                f"{instructions}"
+            )
 
             # Create keyboard
             keyboard = []
@@ -264,51 +350,47 @@ class BotHandlers:
             current_set = int(exercise.get('current_set', 1))  # Convert to int
             total_sets = int(exercise.get('sets', 3))  # Convert to int
 
-            message = f"💪 Упражнение {current}/{total}\n\n"
-            message += f"📍 {exercise['name']}\n"
-            message += f"🎯 Целевые мышцы: {exercise['target_muscle']}\n"
-            message += f"⭐ Сложность: {exercise.get('difficulty', 'средний')}\n\n"
-            message += f"Сет {current_set}/{total_sets}\n"
-
             # Check if exercise has time or reps data
             has_time = 'time' in exercise and int(exercise.get('time', 0)) > 0
             has_reps = 'reps' in exercise and int(exercise.get('reps', 0)) > 0
-            
+
             if has_time:
                 # For time-based exercises (like running on treadmill)
                 exercise_time = int(exercise.get('time', 0))
                 time_minutes = exercise_time // 60
                 time_seconds = exercise_time % 60
-                
+
                 if time_minutes > 0:
-                    message += f"⏱ Время: {time_minutes} мин {time_seconds} сек\n"
+                    volume_line = f"⏱ Время: {time_minutes} мин {time_seconds} сек"
                 else:
-                    message += f"⏱ Время: {time_seconds} сек\n"
-            elif has_reps:
-                # For rep-based exercises
-                message += f"🔄 Повторения: {int(exercise['reps'])}\n"  # Convert to int
+                    volume_line = f"⏱ Время: {time_seconds} сек"
+                instructions = SET_TIMED_INSTRUCTIONS
             else:
-                # Fallback if neither is present
-                message += f"🔄 Подходов: {total_sets}\n"
+                if has_reps:
+                    # For rep-based exercises
+                    volume_line = f"🔄 Повторения: {int(exercise['reps'])}"  # Convert to int
+                else:
+                    # Fallback if neither is present
+                    volume_line = f"🔄 Подходов: {total_sets}"
+                instructions = SET_REPS_INSTRUCTIONS
 
             # Fix the type error by converting weight to float first
             weight = self._safe_float_convert(exercise.get('weight', 0))
-            if weight > 0:
-                message += f"🏋️ Вес: {int(weight)} кг\n"
+            weight_line = f"🏋️ Вес: {int(weight)} кг\n" if weight > 0 else ""
 
             sets_rest = int(exercise['sets_rest'])  # Convert to int
-            message += f"\n⏰ Отдых между сетами: {sets_rest} сек"
 
-            # Add instructions
-            message += "\n\n📋 Как выполнять:"
-            if has_time:
-                message += "\n1️⃣ Нажмите кнопку '⏱ Старт упражнения' чтобы начать таймер"
-                message += "\n2️⃣ Выполняйте упражнение пока идет таймер"
-                message += "\n3️⃣ После сигнала таймера нажмите '✅ Сет выполнен'"
-            else:
-                message += "\n1️⃣ Выполните указанное количество повторений с заданным весом"
-                message += "\n2️⃣ Нажмите '✅ Сет выполнен'"
-            message += "\n3️⃣ Отдохните, нажав кнопку таймера"
+            message = (
+                f"💪 Упражнение {current}/{total}\n\n"
+                f"📍 {exercise['name']}\n"
+                f"🎯 Целевые мышцы: {exercise['target_muscle']}\n"
+                f"⭐ Сложность: {exercise.get('difficulty', 'средний')}\n\n"
+                f"Сет {current_set}/{total_sets}\n"
+                f"{volume_line}\n"
+                f"{weight_line}"
+                f"\n⏰ Отдых между сетами: {sets_rest} сек"
+                f"{instructions}"
+            )
 
             # Create keyboard
             keyboard = []
@@ -347,64 +429,79 @@ class BotHandlers:
         reply_markup = InlineKeyboardMarkup(keyboard)
 
         try:
-            if 'gif_url' in exercise:
-                try:
-                    if update.callback_query:
-                        await update.callback_query.message.reply_animation(
-                            animation=exercise['gif_url'],
-                            caption=message,
-                            reply_markup=reply_markup
-                        )
-                        try:
-                            await update.callback_query.message.delete()
-                        except Exception:
-                            pass
-                    else:
-                        await update.message.reply_animation(
-                            animation=exercise['gif_url'],
-                            caption=message,
-                            reply_markup=reply_markup
-                        )
-                except Exception as e:
-                    logger.error(f"Failed to send GIF: {str(e)}")
-                    if update.callback_query:
-                        await update.callback_query.message.reply_text(
-                            text=message,
-                            reply_markup=reply_markup
-                        )
-                    else:
-                        await update.message.reply_text(
-                            text=message,
-                            reply_markup=reply_markup
-                        )
-            else:
-                if update.callback_query:
-                    await update.callback_query.message.reply_text(
-                        text=message,
-                        reply_markup=reply_markup
-                    )
-                else:
-                    await update.message.reply_text(
-                        text=message,
-                        reply_markup=reply_markup
-                    )
+            if edit and update.callback_query:
+                if await self._edit_exercise_message(update.callback_query, exercise, message, reply_markup):
+                    return
+
+            target = update.callback_query.message if update.callback_query else update.message
+            await self._send_exercise_message(target, exercise, message, reply_markup)
+            if edit and update.callback_query:
+                # Only once the replacement is out: if sending fails the old
+                # message and its buttons stay, and in groups the reply quotes it
+                await self._delete_message_quietly(target)
 
         except Exception as e:
             logger.error(f"Error in _show_gym_exercise: {str(e)}")
-            error_message = "Произошла ошибка. Пожалуйста, начните тренировку заново."
+            error_message = messages.WORKOUT_ERROR
             if update.callback_query:
                 await update.callback_query.message.reply_text(error_message)
             else:
                 await update.message.reply_text(error_message)
 
-    async def _finish_workout(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def _edit_exercise_message(self, query, exercise, message, reply_markup):
+        """Edit the callback's exercise message in place; False if it has to be resent"""
+        # Telegram can't turn a text message into an animation or back
+        if 'gif_url' in exercise:
+            if query.message.animation is None:
+                return False
+        elif query.message.text is None:
+            return False
+
+        try:
+            if 'gif_url' in exercise:
+                await query.edit_message_media(
+                    media=InputMediaAnimation(media=exercise['gif_url'], caption=message),
+                    reply_markup=reply_markup
+                )
+            else:
+                await query.edit_message_text(text=message, reply_markup=reply_markup)
+        except BadRequest as e:
+            if 'not modified' in str(e):
+                return True
+            logger.warning(f"Could not edit exercise message, resending: {e}")
+            return False
+        return True
+
+    async def _send_exercise_message(self, target, exercise, message, reply_markup):
+        """Reply to target with the exercise, as a GIF when it has one"""
+        if 'gif_url' in exercise:
+            try:
+                await target.reply_animation(
+                    animation=exercise['gif_url'],
+                    caption=message,
+                    reply_markup=reply_markup
+                )
+                return
+            except Exception as e:
+                logger.error(f"Failed to send GIF: {str(e)}")
+        await target.reply_text(text=message, reply_markup=reply_markup)
+
+    async def _delete_message_quietly(self, message):
+        """Delete a message, ignoring messages that are already gone"""
+        try:
+            await message.delete()
+        except Exception:
+            pass
+
+    async def _finish_workout(self, update: Update, context: ContextTypes.DEFAULT_TYPE, workout=None):
         """Complete workout and save user's progress"""
         user_id = update.effective_user.id
-        workout = self.db.get_active_workout(user_id)
+        if workout is None:
+            workout = await self._db_call(self.db.get_active_workout, user_id)
 
         if not workout:
             # Use effective_chat which works in both message and callback contexts
-            await update.effective_chat.send_message("У вас нет активной тренировки.")
+            await update.effective_chat.send_message(messages.NO_ACTIVE_WORKOUT)
             return
 
         try:
@@ -415,15 +512,18 @@ class BotHandlers:
             current_exercise = 0
             total_exercises = 0
 
-        # Create completion data
+        # Create completion data, reading the clock once
+        now = datetime.now()
+        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
+        workout_id = workout.get('workout_id') or f"workout_{now.strftime('%Y%m%d_%H%M%S')}"
         completion_data = {
-            'workout_id': workout.get('workout_id', f"workout_{datetime.now().strftime('%Y%m%d_%H%M%S')}"),
+            'workout_id': workout_id,
             'workout_type': workout.get('workout_type', 'unknown'),
             'exercises_completed': current_exercise,
             'total_exercises': total_exercises,
             'workout_completed': True,
-            'date': datetime.now().strftime('%Y-%m-%d'),
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'date': timestamp[:10],
+            'timestamp': timestamp
         }
 
         # Save the workout_id in context for feedback
@@ -432,7 +532,7 @@ class BotHandlers:
         success = True
         error_message = None
         try:
-            self.db.save_workout_progress(user_id, completion_data)
+            await self._db_call(self.db.save_workout_progress, user_id, completion_data)
             logger.info(f"Saved workout progress for user {user_id}: {completion_data}")
         except Exception as e:
             success = False
@@ -440,21 +540,10 @@ class BotHandlers:
             logger.error(f"Error saving workout progress: {e}")
 
         # Remove active workout
-        self.db.finish_active_workout(user_id)
+        await self._db_call(self.db.finish_active_workout, user_id)
 
         # Prepare feedback buttons
-        keyboard = [
-            [
-                InlineKeyboardButton("👍 Понравилось", callback_data="feedback_fun"),
-                InlineKeyboardButton("👎 Не понравилось", callback_data="feedback_not_fun")
-            ],
-            [
-                InlineKeyboardButton("😅 Было легко", callback_data="feedback_too_easy"),
-                InlineKeyboardButton("😊 Нормально", callback_data="feedback_ok"),
-                InlineKeyboardButton("😓 Устал(а)", callback_data="feedback_tired")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = FEEDBACK_MARKUP
 
         # Handle both direct message and callback query cases
         if success:
@@ -495,7 +584,8 @@ class BotHandlers:
         
         async def update_timer():
             try:
-                for remaining in range(rest_time - 1, -1, -1):
+                previous = rest_time
+                for remaining in _timer_checkpoints(rest_time):
                     # Check if timer was cancelled
                     if not context.chat_data.get('current_timer', {}).get('is_active', False):
                         logger.info("Timer was cancelled, exiting timer loop")
@@ -505,7 +595,8 @@ class BotHandlers:
                     if 'current_timer' in context.chat_data:
                         context.chat_data['current_timer']['remaining_time'] = remaining
                     
-                    await asyncio.sleep(1)
+                    await asyncio.sleep(previous - remaining)
+                    previous = remaining
                     try:
                         if remaining > 0:
                             await timer_message.edit_text(f"⏱ {timer_type}: {remaining} сек")
@@ -525,7 +616,7 @@ class BotHandlers:
                                 context.chat_data['current_timer']['is_active'] = False
                                 
                                 # Get workout and auto-progress
-                                workout = self.db.get_active_workout(user_id)
+                                workout = await self._db_call(self.db.get_active_workout, user_id)
                                 if workout:
                                     # Update the workout state
                                     if workout['workout_type'] == 'bodyweight':
@@ -568,11 +659,9 @@ class BotHandlers:
         
         # Start timer in background with better error handling
         try:
-            # Get current event loop
-            loop = asyncio.get_event_loop()
-            
-            # Create task and store it in context for potential cancellation
-            timer_task = loop.create_task(update_timer())
+            # Run the countdown as its own task so this callback returns right
+            # away; keep it in context for potential cancellation
+            timer_task = asyncio.create_task(update_timer())
             if 'timer_tasks' not in context.chat_data:
                 context.chat_data['timer_tasks'] = []
             context.chat_data['timer_tasks'].append(timer_task)
@@ -592,39 +681,19 @@ class BotHandlers:
             logger.error(f"Failed to create timer task: {e}", exc_info=True)
             await timer_message.edit_text(f"❌ Ошибка запуска таймера: {e}")
 
-    async def handle_gym_workout_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle workout callbacks"""
-        query = update.callback_query
-        await query.answer()
-
-        user_id = update.effective_user.id
-        logger.info(f"Handling workout callback: {query.data} for user {user_id}")
-        
-        workout = self.db.get_active_workout(user_id)
-
-        if not workout:
-            logger.warning(f"No active workout found for user {user_id} with callback {query.data}")
-            await query.message.reply_text(
-                "Тренировка не найдена. Используйте /workout для получения программы."
-            )
-            return
-
-        # Handle exercise timer
-        if query.data.startswith("exercise_timer_"):
-            logger.info(f"Processing exercise timer callback: {query.data}")
-            time = int(query.data.split('_')[2])
-            await self.handle_exercise_timer(update, context, time)
-            return
-
+    def _cancel_timers(self, context: ContextTypes.DEFAULT_TYPE):
+        """Stop the chat's running timers so none of them auto-progresses the workout"""
         # Mark any running timer as cancelled so it doesn't auto-progress
         if 'current_timer' in context.chat_data:
             context.chat_data['current_timer']['is_active'] = False
             logger.info("Marked current timer as inactive")
 
-        # Cancel any active timer tasks
+        # Cancel any active timer tasks, except a finished timer that is
+        # auto-progressing the workout from inside its own task
         if 'timer_tasks' in context.chat_data:
+            current = asyncio.current_task()
             for task in context.chat_data['timer_tasks'][:]:  # Use a copy to safely iterate
-                if not task.done() and not task.cancelled():
+                if task is not current and not task.done() and not task.cancelled():
                     try:
                         task.cancel()
                         logger.info("Cancelled active timer task")
@@ -634,6 +703,39 @@ class BotHandlers:
             context.chat_data['timer_tasks'] = []
             logger.info("Cleared timer tasks list")
 
+    async def handle_gym_workout_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle workout callbacks"""
+        query = update.callback_query
+        await query.answer()
+
+        user_id = update.effective_user.id
+        data = query.data
+        logger.info(f"Handling workout callback: {data} for user {user_id}")
+        
+        workout = await self._db_call(self.db.get_active_workout, user_id)
+
+        if not workout:
+            logger.warning(f"No active workout found for user {user_id} with callback {data}")
+            await query.message.reply_text(messages.WORKOUT_NOT_FOUND)
+            return
+
+        # One timer per chat: any running timer is stopped before the next
+        # one starts or the workout moves on
+        self._cancel_timers(context)
+
+        # Timed callbacks carry their duration as the last segment
+        action, _, arg = data.rpartition('_')
+        if arg.isdigit():
+            arg = int(arg)
+        else:
+            action, arg = data, None
+
+        # Handle exercise timer
+        if action == "exercise_timer":
+            logger.info(f"Processing exercise timer callback: {data}")
+            await self.handle_exercise_timer(update, context, arg)
+            return
+
         # Clean up any active timer messages when proceeding with workout
         if 'timer_messages' in context.chat_data:
             for msg_id in context.chat_data['timer_messages'][:]:  # Create a copy of the list to iterate
@@ -649,123 +751,117 @@ class BotHandlers:
                     context.chat_data['timer_messages'].remove(msg_id)
                 except ValueError:
                     pass
-            
-        # Convert Decimal values to int
-        current_exercise_idx = int(workout['current_exercise'])
-        total_exercises = int(workout['total_exercises'])
-        logger.info(f"Current exercise: {current_exercise_idx+1}/{total_exercises}")
+
+        logger.info(f"Current exercise: {int(workout['current_exercise'])+1}/{int(workout['total_exercises'])}")
 
         if workout['workout_type'] == 'bodyweight':
             logger.info("Processing bodyweight workout callback")
+            actions = self._BODYWEIGHT_ACTIONS
+        else:
+            logger.info("Processing gym workout callback")
+            actions = self._GYM_ACTIONS
+
+        handler = actions.get(action)
+        if handler:
+            await handler(self, update, context, workout, arg)
+
+    async def _exercise_done(self, update, context, workout, arg):
+        """Advance a bodyweight workout to the next exercise or circuit"""
+        logger.info("Exercise completed")
+        # Convert Decimal values to int
+        current_exercise_idx = int(workout['current_exercise'])
+        total_exercises = int(workout['total_exercises'])
+        if current_exercise_idx < total_exercises - 1:
+            # Move to next exercise in current circuit
+            workout['current_exercise'] = current_exercise_idx + 1
+        else:
+            # Last exercise in circuit completed
             current_circuit = int(workout.get('current_circuit', 1))
-            exercise = workout['exercises'][current_exercise_idx]
-            total_circuits = int(exercise.get('circuits', 3))
-
-            if query.data == "exercise_done":
-                logger.info("Exercise completed")
-                if current_exercise_idx < total_exercises - 1:
-                    # Move to next exercise in current circuit
-                    workout['current_exercise'] = current_exercise_idx + 1
-                    self.db.save_active_workout(user_id, workout)
-                    # Delete previous exercise message
-                    try:
-                        await query.message.delete()
-                    except Exception:
-                        pass
-                    await self._show_gym_exercise(update, context)
-                else:
-                    # Last exercise in circuit completed
-                    if current_circuit < total_circuits:
-                        # Start next circuit from first exercise
-                        workout['current_exercise'] = 0
-                        workout['current_circuit'] = current_circuit + 1
-                        self.db.save_active_workout(user_id, workout)
-                        # Delete previous exercise message
-                        try:
-                            await query.message.delete()
-                        except Exception:
-                            pass
-                        await self._show_gym_exercise(update, context)
-                    else:
-                        # All circuits completed
-                        await self._finish_workout(update, context)
+            total_circuits = int(workout['exercises'][current_exercise_idx].get('circuits', 3))
+            if current_circuit >= total_circuits:
+                # All circuits completed
+                await self._finish_workout(update, context, workout=workout)
+                return
+            # Start next circuit from first exercise
+            workout['current_exercise'] = 0
+            workout['current_circuit'] = current_circuit + 1
+        await self._db_call(self.db.save_active_workout, update.effective_user.id, workout)
+        await self._show_gym_exercise(update, context, edit=True, workout=workout)
 
-            elif query.data.startswith("circuit_rest_"):
-                rest_time = int(query.data.split('_')[2])
-                logger.info(f"Starting circuit rest timer for {rest_time} seconds")
-                await self.handle_timer(update, context, "Отдых между кругами", rest_time)
+    async def _circuit_rest(self, update, context, workout, rest_time):
+        logger.info(f"Starting circuit rest timer for {rest_time} seconds")
+        await self.handle_timer(update, context, "Отдых между кругами", rest_time)
 
-            elif query.data.startswith("exercise_rest_"):
-                rest_time = int(query.data.split('_')[2])
-                logger.info(f"Starting exercise rest timer for {rest_time} seconds")
-                await self.handle_timer(update, context, "Отдых между упражнениями", rest_time)
+    async def _exercise_rest(self, update, context, workout, rest_time):
+        logger.info(f"Starting exercise rest timer for {rest_time} seconds")
+        await self.handle_timer(update, context, "Отдых между упражнениями", rest_time)
 
+    async def _set_done(self, update, context, workout, arg):
+        """Advance a gym workout to the next set or exercise"""
+        logger.info("Set completed callback")
+        current_exercise_idx = int(workout['current_exercise'])
+        total_exercises = int(workout['total_exercises'])
+        exercises = workout['exercises']
+        exercise = exercises[current_exercise_idx]
+        current_set = int(exercise.get('current_set', 1))
+        total_sets = int(exercise.get('sets', 3))
+        logger.info(f"Current set: {current_set}/{total_sets}")
+
+        if current_set < total_sets:
+            logger.info(f"Moving to next set ({current_set+1}/{total_sets})")
+            exercise['current_set'] = current_set + 1
+        elif current_exercise_idx < total_exercises - 1:
+            logger.info("All sets completed, moving to next exercise")
+            workout['current_exercise'] = current_exercise_idx + 1
+            exercises[current_exercise_idx + 1]['current_set'] = 1
         else:
-            # Gym workout callback handling
-            logger.info("Processing gym workout callback")
-            if query.data == "set_done":
-                logger.info("Set completed callback")
-                exercise = workout['exercises'][current_exercise_idx]
-                current_set = int(exercise.get('current_set', 1))
-                total_sets = int(exercise.get('sets', 3))
-                logger.info(f"Current set: {current_set}/{total_sets}")
-
-                if current_set < total_sets:
-                    logger.info(f"Moving to next set ({current_set+1}/{total_sets})")
-                    exercise['current_set'] = current_set + 1
-                    self.db.save_active_workout(user_id, workout)
-                    # Delete previous exercise message
-                    try:
-                        await query.message.delete()
-                    except Exception:
-                        pass
-                    await self._show_gym_exercise(update, context)
-                else:
-                    if current_exercise_idx < total_exercises - 1:
-                        logger.info("All sets completed, moving to next exercise")
-                        workout['current_exercise'] = current_exercise_idx + 1
-                        workout['exercises'][current_exercise_idx + 1]['current_set'] = 1
-                        self.db.save_active_workout(user_id, workout)
-                        # Delete previous exercise message
-                        try:
-                            await query.message.delete()
-                        except Exception:
-                            pass
-                        await self._show_gym_exercise(update, context)
-                    else:
-                        logger.info("All exercises completed, finishing workout")
-                        await self._finish_workout(update, context)
+            logger.info("All exercises completed, finishing workout")
+            await self._finish_workout(update, context, workout=workout)
+            return
+        await self._db_call(self.db.save_active_workout, update.effective_user.id, workout)
+        await self._show_gym_exercise(update, context, edit=True, workout=workout)
 
-            elif query.data.startswith("rest_"):
-                rest_time = int(query.data.split('_')[1])
-                logger.info(f"Starting rest timer for {rest_time} seconds")
-                await self.handle_timer(update, context, "Отдых", rest_time)
+    async def _rest(self, update, context, workout, rest_time):
+        logger.info(f"Starting rest timer for {rest_time} seconds")
+        await self.handle_timer(update, context, "Отдых", rest_time)
 
-        if query.data == "prev_exercise" and current_exercise_idx > 0:
+    async def _prev_exercise(self, update, context, workout, arg):
+        current_exercise_idx = int(workout['current_exercise'])
+        if current_exercise_idx > 0:
             logger.info("Moving to previous exercise")
             workout['current_exercise'] = current_exercise_idx - 1
-            self.db.save_active_workout(user_id, workout)
-            # Delete previous exercise message
-            try:
-                await query.message.delete()
-            except Exception:
-                pass
-            await self._show_gym_exercise(update, context)
+            await self._db_call(self.db.save_active_workout, update.effective_user.id, workout)
+            await self._show_gym_exercise(update, context, edit=True, workout=workout)
 
-        elif query.data == "next_exercise" and current_exercise_idx < total_exercises - 1:
+    async def _next_exercise(self, update, context, workout, arg):
+        current_exercise_idx = int(workout['current_exercise'])
+        if current_exercise_idx < int(workout['total_exercises']) - 1:
             logger.info("Moving to next exercise")
             workout['current_exercise'] = current_exercise_idx + 1
-            self.db.save_active_workout(user_id, workout)
-            # Delete previous exercise message
-            try:
-                await query.message.delete()
-            except Exception:
-                pass
-            await self._show_gym_exercise(update, context)
-
-        elif query.data == "finish_workout":
-            logger.info("Finishing workout")
-            await self._finish_workout(update, context)
+            await self._db_call(self.db.save_active_workout, update.effective_user.id, workout)
+            await self._show_gym_exercise(update, context, edit=True, workout=workout)
+
+    async def _finish_workout_callback(self, update, context, workout, arg):
+        logger.info("Finishing workout")
+        await self._finish_workout(update, context, workout=workout)
+
+    # Workout callback actions, keyed by callback data without its duration
+    _NAVIGATION_ACTIONS = {
+        'prev_exercise': _prev_exercise,
+        'next_exercise': _next_exercise,
+        'finish_workout': _finish_workout_callback,
+    }
+    _BODYWEIGHT_ACTIONS = {
+        'exercise_done': _exercise_done,
+        'circuit_rest': _circuit_rest,
+        'exercise_rest': _exercise_rest,
+        **_NAVIGATION_ACTIONS,
+    }
+    _GYM_ACTIONS = {
+        'set_done': _set_done,
+        'rest': _rest,
+        **_NAVIGATION_ACTIONS,
+    }
 
     async def handle_exercise_timer(self, update: Update, context: ContextTypes.DEFAULT_TYPE, exercise_time: int):
         """Handle exercise duration timer"""
@@ -797,7 +893,8 @@ class BotHandlers:
         
         async def update_exercise_timer():
             try:
-                for remaining in range(exercise_time - 1, -1, -1):
+                previous = exercise_time
+                for remaining in _timer_checkpoints(exercise_time):
                     # Check if timer was cancelled
                     if not context.chat_data.get('current_timer', {}).get('is_active', False):
                         logger.info("Exercise timer was cancelled, exiting timer loop")
@@ -807,7 +904,8 @@ class BotHandlers:
                     if 'current_timer' in context.chat_data:
                         context.chat_data['current_timer']['remaining_time'] = remaining
                     
-                    await asyncio.sleep(1)
+                    await asyncio.sleep(previous - remaining)
+                    previous = remaining
                     try:
                         if remaining > 0:
                             await timer_message.edit_text(
@@ -853,11 +951,9 @@ class BotHandlers:
         
         # Start timer in background with better error handling
         try:
-            # Get current event loop
-            loop = asyncio.get_event_loop()
-            
-            # Create task and store it in context for potential cancellation
-            timer_task = loop.create_task(update_exercise_timer())
+            # Run the countdown as its own task so this callback returns right
+            # away; keep it in context for potential cancellation
+            timer_task = asyncio.create_task(update_exercise_timer())
             if 'timer_tasks' not in context.chat_data:
                 context.chat_data['timer_tasks'] = []
             context.chat_data['timer_tasks'].append(timer_task)
@@ -920,14 +1016,14 @@ class BotHandlers:
             logger.info(f"User {update.effective_user.id} started the bot")
         except Exception as e:
             logger.error(f"Error in start handler: {e}")
-            await update.message.reply_text("Произошла ошибка. Пожалуйста, попробуйте еще раз.")
+            await update.message.reply_text(messages.RETRY_ERROR)
 
     async def view_profile(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """View existing profile"""
         user_id = update.effective_user.id
         logger.info(f"Viewing profile for user {user_id}")
-        profile = self.db.get_user_profile(user_id)
-        logger.info(f"Retrieved profile data: {profile}")
+        profile = await self._db_call(self.db.get_user_profile, user_id)
+        logger.debug("Retrieved profile data: %s", profile)
 
         if not profile:
             logger.warning(f"No profile found for user {user_id}")
@@ -937,18 +1033,19 @@ class BotHandlers:
             return
 
         # Format profile data
-        profile_text = "🏋️‍♂️ Ваш профиль:\n\n"
-        profile_text += f"📊 Возраст: {profile['age']} лет\n"
-        profile_text += f"📏 Рост: {profile['height']} см\n"
-        profile_text += f"⚖️ Вес: {profile['weight']} кг\n"
-        profile_text += f"👤 Пол: {profile['sex']}\n"
-        profile_text += f"🎯 Цели: {profile['goals']}\n"
-        profile_text += f"💪 Уровень подготовки: {profile['fitness_level']}\n"
-        profile_text += f"🏋️ Оборудование: {profile['equipment']}\n"
+        profile_text = (
+            "🏋️‍♂️ Ваш профиль:\n\n"
+            f"📊 Возраст: {profile['age']} лет\n"
+            f"📏 Рост: {profile['height']} см\n"
+            f"⚖️ Вес: {profile['weight']} кг\n"
+            f"👤 Пол: {profile['sex']}\n"
+            f"🎯 Цели: {profile['goals']}\n"
+            f"💪 Уровень подготовки: {profile['fitness_level']}\n"
+            f"🏋️ Оборудование: {profile['equipment']}\n"
+        )
 
         # Add update option
-        keyboard = [[InlineKeyboardButton("🔄 Обновить профиль", callback_data="update_profile_full")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = UPDATE_PROFILE_MARKUP
 
         await update.message.reply_text(profile_text, reply_markup=reply_markup)
         logger.info(f"Successfully displayed profile for user {user_id}")
@@ -957,17 +1054,13 @@ class BotHandlers:
         """Start the profile creation process"""
         user_id = update.effective_user.id
         logger.info(f"Starting profile process for user {user_id}")
-        profile = self.db.get_user_profile(user_id)
+        profile = await self._db_call(self.db.get_user_profile, user_id)
 
-        logger.info(f"Retrieved user profile - ID: {user_id}, Profile: {profile}")
+        logger.debug("Retrieved user profile - ID: %s, Profile: %s", user_id, profile)
 
         if profile:
             # If profile exists, ask if user wants to update
-            keyboard = [
-                [InlineKeyboardButton("✅ Да, обновить все поля", callback_data="update_profile_full")],
-                [InlineKeyboardButton("❌ Нет, оставить текущий", callback_data="keep_profile")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = REPLACE_PROFILE_MARKUP
             logger.info(f"Existing profile check result: {bool(profile)}")
             await update.message.reply_text(
                 "У вас уже есть профиль. Хотите обновить его?",
@@ -1089,7 +1182,7 @@ class BotHandlers:
     async def workout(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Generate and show workout preview"""
         user_id = update.effective_user.id
-        profile = self.db.get_user_profile(user_id)
+        profile = await self._db_call(self.db.get_user_profile, user_id)
 
         if not profile:
             await update.message.reply_text(
@@ -1100,15 +1193,7 @@ class BotHandlers:
         equipment = profile.get('equipment', '').lower()
         if 'зал' in equipment:
             # Show muscle group selection for gym users
-            keyboard = [
-                [
-                    InlineKeyboardButton("Грудь + Бицепс", callback_data="preview_грудь_бицепс"),
-                    InlineKeyboardButton("Спина + Трицепс", callback_data="preview_спина_трицепс")
-                ],
-                [InlineKeyboardButton("Ноги", callback_data="preview_ноги")],
-                [InlineKeyboardButton("Тренировка на все группы мышц", callback_data="preview_все_группы")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = PREVIEW_GROUP_MARKUP
             await update.message.reply_text(
                 "Выберите тип тренировки для предпросмотра:",
                 reply_markup=reply_markup
@@ -1117,7 +1202,7 @@ class BotHandlers:
 
         # For non-gym users, generate and show bodyweight workout preview
         workout = self.workout_manager.generate_bodyweight_workout(profile)
-        self.db.save_preview_workout(user_id, workout)
+        await self._db_call(self.db.save_preview_workout, user_id, workout)
         overview = self.workout_manager._generate_bodyweight_overview(workout, profile.get('goals', 'Общая физическая подготовка'))
         overview += "\n📱 Используйте /start_workout для начала тренировки"
         await update.message.reply_text(overview)
@@ -1126,16 +1211,16 @@ class BotHandlers:
         """Start a workout session"""
         user_id = update.effective_user.id
         logger.info(f"User {user_id} starting workout")
-        profile = self.db.get_user_profile(user_id)
+        profile = await self._db_call(self.db.get_user_profile, user_id)
 
         if not profile:
             logger.warning(f"No profile found for user {user_id}")
-            await update.message.reply_text("Сначала создайте профиль командой /profile")
+            await update.message.reply_text(messages.PROFILE_REQUIRED)
             return
 
         # Get the previewed workout for any user type
         logger.info(f"Attempting to retrieve preview workout for user {user_id}")
-        workout = self.db.get_preview_workout(user_id)
+        workout = await self._db_call(self.db.get_preview_workout, user_id)
         
         # If no preview exists, check equipment and handle accordingly
         if not workout:
@@ -1145,17 +1230,9 @@ class BotHandlers:
             if 'зал' in equipment:
                 # For gym users, they need to preview a workout first
                 logger.info(f"Gym user {user_id} needs to preview workout first")
-                keyboard = [
-                    [
-                        InlineKeyboardButton("Грудь + Бицепс", callback_data="preview_грудь_бицепс"),
-                        InlineKeyboardButton("Спина + Трицепс", callback_data="preview_спина_трицепс")
-                    ],
-                    [InlineKeyboardButton("Ноги", callback_data="preview_ноги")],
-                    [InlineKeyboardButton("Тренировка на все группы мышц", callback_data="preview_все_группы")]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+                reply_markup = PREVIEW_GROUP_MARKUP
                 logger.info(f"Created keyboard with workout preview options for user {user_id}")
-                for row in keyboard:
+                for row in reply_markup.inline_keyboard:
                     for btn in row:
                         logger.info(f"Button: {btn.text}, callback_data: {btn.callback_data}")
                 
@@ -1168,7 +1245,7 @@ class BotHandlers:
                     logger.info(f"Message with workout options sent successfully")
                 except Exception as e:
                     logger.error(f"Error sending workout options: {e}")
-                    await update.message.reply_text("Произошла ошибка. Пожалуйста, попробуйте еще раз.")
+                    await update.message.reply_text(messages.RETRY_ERROR)
                 return
             else:
                 # For bodyweight users, generate a new workout
@@ -1182,7 +1259,7 @@ class BotHandlers:
         
         # For both gym and bodyweight users, start the workout
         logger.info(f"Starting active workout for user {user_id}")
-        self.db.start_active_workout(user_id, workout)
+        await self._db_call(self.db.start_active_workout, user_id, workout)
         await self._show_gym_exercise(update, context)
 
     async def check_subscription_middleware(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1196,7 +1273,7 @@ class BotHandlers:
             if command in free_commands:
                 return True
 
-        has_access = self.db.check_subscription_status(user_id)
+        has_access = await self._db_call(self.db.check_subscription_status, user_id)
         if not has_access:
             await update.message.reply_text(
                 "⚠️ Ваш пробный период закончился или подписка истекла.\n"
@@ -1217,7 +1294,7 @@ class BotHandlers:
             return
 
         # Get current subscription status
-        subscription = self.db.get_subscription(user_id)
+        subscription = await self._db_call(self.db.get_subscription, user_id)
         
         if subscription and subscription.get('active'):
             expiry_date = subscription.get('expiry_date', 'неизвестно')
@@ -1405,7 +1482,7 @@ class BotHandlers:
             # Check payment result
             if payment_result:
                 # Retrieve subscription details - Fixed: changed self.database to self.db
-                subscription = self.db.get_subscription(user_id)
+                subscription = await self._db_call(self.db.get_subscription, user_id)
                 expiry_date = subscription.get('expiry_date', 'следующий месяц') if subscription else 'следующий месяц'
                 
                 await message.reply_text(
@@ -1522,7 +1599,7 @@ class BotHandlers:
                     
                     if success:
                         # Get subscription details
-                        subscription = self.db.get_subscription(query.from_user.id)
+                        subscription = await self._db_call(self.db.get_subscription, query.from_user.id)
                         expiry_date = subscription.get('expiry_date', 'неизвестно')
                         
                         await query.message.reply_text(
@@ -1592,8 +1669,8 @@ class BotHandlers:
 
             # Get stats once at the beginning
             logger.info(f"Retrieving statistics for user {user_id}")
-            stats = self.db.get_detailed_progress_stats(user_id)
-            logger.info(f"Retrieved stats: {stats}")
+            stats = await self._db_call(self.db.get_detailed_progress_stats, user_id)
+            logger.debug("Retrieved stats: %s", stats)
             message = ""
 
             if query.data == "progress_weekly":
@@ -1642,7 +1719,7 @@ class BotHandlers:
                 logger.info("Processing workout history view")
                 try:
                     logger.info(f"Attempting to get workout history for user {user_id}")
-                    workouts = self.db.get_user_workouts(user_id, limit=10)
+                    workouts = await self._db_call(self.db.get_user_workouts, user_id, limit=10)
                     logger.info(f"Retrieved {len(workouts)} workouts for history view")
                     
                     message = "*📋 История тренировок*\n\n"
@@ -1687,8 +1764,7 @@ class BotHandlers:
                 return
 
             # Add back button for all views
-            keyboard = [[InlineKeyboardButton("Назад к дашборду", callback_data="back_to_dashboard")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = BACK_TO_DASHBOARD_MARKUP
             
             # Try to edit the message or send a new one
             try:
@@ -1751,7 +1827,7 @@ class BotHandlers:
             start_date = now.replace(day=1).date()
             end_date = now.date()
 
-            workouts = self.db.get_workouts_by_date(user_id, start_date, end_date)
+            workouts = await self._db_call(self.db.get_workouts_by_date, user_id, start_date, end_date)
             logger.info(f"Retrieved {len(workouts) if workouts else 0} workouts for calendar")
 
             # Generate calendar keyboard
@@ -1789,7 +1865,7 @@ class BotHandlers:
                 start_date = datetime(year, month, 1).date()
                 end_date = (datetime(year, month + 1, 1) if month < 12 else datetime(year + 1, 1, 1)).date() - timedelta(days=1)
 
-                workouts = self.db.get_workouts_by_date(query.from_user.id, start_date, end_date)
+                workouts = await self._db_call(self.db.get_workouts_by_date, query.from_user.id, start_date, end_date)
                 logger.info(f"Retrieved {len(workouts) if workouts else 0} workouts for {year}-{month}")
 
                 # Update calendar view
@@ -1802,7 +1878,7 @@ class BotHandlers:
                 selected_date = datetime.strptime(data[1], '%Y-%m-%d').date()
                 logger.info(f"Selected date: {selected_date}")
 
-                workouts = self.db.get_workouts_by_date(query.from_user.id, selected_date, selected_date)
+                workouts = await self._db_call(self.db.get_workouts_by_date, query.from_user.id, selected_date, selected_date)
                 logger.info(f"Found {len(workouts) if workouts else 0} workouts for selected date")
 
                 if workouts:
@@ -1829,7 +1905,7 @@ class BotHandlers:
         logger.info(f"Setting reminder for user {user_id}")
 
         # Check if user already has a reminder
-        current_reminder = self.db.get_reminder(user_id)
+        current_reminder = await self._db_call(self.db.get_reminder, user_id)
 
         if current_reminder:
             message = f"⏰ Текущее напоминание установлено на {current_reminder}\n"
@@ -1851,7 +1927,7 @@ class BotHandlers:
             user_id = update.effective_user.id
 
             # Save reminder in database
-            self.db.set_reminder(user_id, time)
+            await self._db_call(self.db.set_reminder, user_id, time)
 
             # Set up reminder in reminder manager
             self.reminder_manager.set_reminder(user_id, time)
@@ -1865,10 +1941,10 @@ class BotHandlers:
     async def muscle_group_workout(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle muscle group specific workout commands"""
         user_id = update.effective_user.id
-        profile = self.db.get_user_profile(user_id)
+        profile = await self._db_call(self.db.get_user_profile, user_id)
 
         if not profile:
-            await update.message.reply_text("Сначала создайте профиль командой /profile")
+            await update.message.reply_text(messages.PROFILE_REQUIRED)
             return
 
         equipment = profile.get('equipment', '').lower()
@@ -1899,7 +1975,7 @@ class BotHandlers:
 
         # Generate and cache the workout
         workout = self.workout_manager.generate_muscle_group_workout(profile, muscle_group)
-        self.db.save_preview_workout(user_id, workout)
+        await self._db_call(self.db.save_preview_workout, user_id, workout)
 
         # Generate overview
         overview = self.workout_manager._generate_gym_overview(workout)
@@ -1909,11 +1985,11 @@ class BotHandlers:
         """Handle the /create_muscle_workout command"""
         logger.info(f"User {update.effective_user.id} requested muscle workout creation")
         user_id = update.effective_user.id
-        profile = self.db.get_user_profile(user_id)
+        profile = await self._db_call(self.db.get_user_profile, user_id)
 
         if not profile:
             logger.warning(f"No profile found for user {user_id}")
-            await update.message.reply_text("Сначала создайте профиль командой /profile")
+            await update.message.reply_text(messages.PROFILE_REQUIRED)
             return
 
         equipment = profile.get('equipment', '').lower()
@@ -1926,14 +2002,7 @@ class BotHandlers:
             return
 
         # Create keyboard with muscle group options
-        keyboard = [
-            [
-                InlineKeyboardButton("Грудь + Бицепс", callback_data="muscle_грудь_бицепс"),
-                InlineKeyboardButton("Спина + Трицепс", callback_data="muscle_спина_трицепс")
-            ],
-            [InlineKeyboardButton("Ноги", callback_data="muscle_ноги")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = MUSCLE_GROUP_SPLIT_MARKUP
 
         logger.info(f"Showing muscle group selection buttons to user {user_id}")
         await update.message.reply_text(
@@ -1953,10 +2022,10 @@ class BotHandlers:
         logger.info(f"Message ID: {query.message.message_id}, chat ID: {query.message.chat_id}")
         logger.info(f"Callback message text: {query.message.text[:50]}..." if query.message.text else "No message text")
 
-        profile = self.db.get_user_profile(user_id)
+        profile = await self._db_call(self.db.get_user_profile, user_id)
         if not profile:
             logger.warning(f"No profile found for user {user_id} during muscle group selection")
-            await query.message.reply_text("Сначала создайте профиль командой /profile")
+            await query.message.reply_text(messages.PROFILE_REQUIRED)
             return
 
         try:
@@ -1964,7 +2033,7 @@ class BotHandlers:
             parts = query.data.split('_', 1)  # Split into type and muscle group
             if len(parts) < 2:
                 logger.error(f"Invalid callback format: {query.data}")
-                await query.message.reply_text("Произошла ошибка. Пожалуйста, попробуйте еще раз.")
+                await query.message.reply_text(messages.RETRY_ERROR)
                 return
                 
             callback_type, muscle_group = parts
@@ -1989,7 +2058,7 @@ class BotHandlers:
             if callback_type == 'preview':
                 # Save as preview and show overview
                 logger.info(f"Saving preview workout for user {user_id}")
-                self.db.save_preview_workout(user_id, workout)
+                await self._db_call(self.db.save_preview_workout, user_id, workout)
                 overview = self.workout_manager._generate_gym_overview(workout)
                 overview += "\n📱 Используйте /start_workout для начала тренировки"
                 try:
@@ -2003,12 +2072,9 @@ class BotHandlers:
             elif callback_type == 'muscle':
                 # Start workout immediately
                 logger.info(f"Starting workout immediately for user {user_id}")
-                self.db.start_active_workout(user_id, workout)
-                try:
-                    await query.message.delete()
-                except Exception as e:
-                    logger.error(f"Failed to delete message: {e}")
-                await self._show_gym_exercise(update, context)
+                await self._db_call(self.db.start_active_workout, user_id, workout)
+                # The muscle group menu becomes the first exercise
+                await self._show_gym_exercise(update, context, edit=True, workout=workout)
             else:
                 logger.warning(f"Unknown callback type: {callback_type}")
                 await query.message.reply_text("Неизвестный тип тренировки. Пожалуйста, попробуйте снова.")
@@ -2025,7 +2091,7 @@ class BotHandlers:
 
     async def save_profile(self, user_id, profile_data, telegram_handle=None):
         """Save user profile with trial period initialization"""
-        self.db.save_user_profile(user_id, profile_data, telegram_handle)
+        await self._db_call(self.db.save_user_profile, user_id, profile_data, telegram_handle)
 
         # Initialize trial subscription
         trial_start = datetime.now()
@@ -2035,7 +2101,7 @@ class BotHandlers:
             'trial_start': trial_start.strftime('%Y-%m-%d'),
             'trial_end': trial_end.strftime('%Y-%m-%d'),
         }
-        self.db.save_subscription(user_id, subscription_data)
+        await self._db_call(self.db.save_subscription, user_id, subscription_data)
 
     def get_handlers(self):
         """Return all handlers for the bot"""
@@ -2189,7 +2255,8 @@ class BotHandlers:
         logger.info(f"Attempting to save feedback for user {user_id}, workout {workout_id}")
         logger.info(f"Feedback data: {feedback_data}")
         
-        success = self.db.save_workout_feedback(
+        success = await self._db_call(
+            self.db.save_workout_feedback,
             user_id,
             workout_id,
             feedback_data
@@ -2237,7 +2304,7 @@ class BotHandlers:
         logger.info(f"Admin {user_id} using premium command: {action} for user {target_user_id}")
         
         if action == "add":
-            result = self.db.add_premium_status(target_user_id)
+            result = await self._db_call(self.db.add_premium_status, target_user_id)
             if result:
                 logger.info(f"Successfully added premium status to user {target_user_id}")
                 await update.message.reply_text(f"✅ Премиум статус добавлен для пользователя {target_user_id}.")
@@ -2245,7 +2312,7 @@ class BotHandlers:
                 logger.error(f"Failed to add premium status to user {target_user_id}")
                 await update.message.reply_text(f"❌ Не удалось добавить премиум статус. Возможно, профиль не существует.")
         elif action == "remove":
-            result = self.db.remove_premium_status(target_user_id)
+            result = await self._db_call(self.db.remove_premium_status, target_user_id)
             if result:
                 logger.info(f"Successfully removed premium status from user {target_user_id}")
                 await update.message.reply_text(f"✅ Премиум статус удален для пользователя {target_user_id}.")
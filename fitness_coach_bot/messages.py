@@ -91,6 +91,12 @@ PROGRESS_MESSAGE = """
 REMINDER_SET = "⏰ Напоминание установлено на {}"
 
 ERROR_MESSAGE = "😔 Произошла ошибка. Пожалуйста, попробуйте позже."
+RETRY_ERROR = "Произошла ошибка. Пожалуйста, попробуйте еще раз."
+WORKOUT_ERROR = "Произошла ошибка. Пожалуйста, начните тренировку заново."
+
+PROFILE_REQUIRED = "Сначала создайте профиль командой /profile"
+WORKOUT_NOT_FOUND = "Тренировка не найдена. Используйте /workout для получения программы."
+NO_ACTIVE_WORKOUT = "У вас нет активной тренировки."
 
 FEEDBACK_THANK_YOU = "Спасибо за отзыв! Мы учтем его при составлении следующей тренировки."
 
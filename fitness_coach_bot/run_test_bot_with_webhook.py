@@ -71,11 +71,10 @@ def main():
 
 def modified_main():
     """Modified version of main() from bot.py that fixes payment processing for testing"""
-    from fitness_coach_bot.bot import cleanup_old_instances, signal_handler, PID_FILE
+    from fitness_coach_bot.bot import cleanup_old_instances, shutdown_cleanup, PERSISTENCE_PATH
     from fitness_coach_bot.database import Database
     from fitness_coach_bot.workout_manager import WorkoutManager
     import signal
-    import os
     from telegram.ext import ApplicationBuilder, PicklePersistence
     import logging
     
@@ -93,30 +92,25 @@ def modified_main():
             
         logger.info("Starting bot...")
         
-        # Clean up old instances
-        cleanup_old_instances()
-        
-        # Write PID file
-        with open(PID_FILE, 'w') as f:
-            f.write(str(os.getpid()))
-            
-        # Setup signal handlers
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        # Clean up old instances; this also records our PID while holding the lock
+        if not cleanup_old_instances():
+            return False
             
         # Initialize bot services
         database = Database()
         workout_manager = WorkoutManager(database)
         
         # Set up persistence
-        persistence_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bot_persistence')
-        persistence = PicklePersistence(filepath=persistence_path)
+        persistence = PicklePersistence(filepath=PERSISTENCE_PATH, update_interval=300, on_flush=False)
         
         # Initialize application with persistent data
         application_builder = ApplicationBuilder()
         application_builder.token(TOKEN)
         application_builder.persistence(persistence)
         app = application_builder.build()
+
+        # Remove the PID file after a graceful stop
+        app.post_shutdown = shutdown_cleanup
         
         # Important: Initialize ReminderManager with both app.bot and database
         from fitness_coach_bot.reminder import ReminderManager
@@ -132,8 +126,12 @@ def modified_main():
         # Important: Set up error handler
         app.add_error_handler(lambda update, context: logger.error(f"Update {update} caused error {context.error}"))
         
-        # Run the bot in polling mode to properly handle payment callbacks
-        app.run_polling(allowed_updates=['message', 'callback_query', 'pre_checkout_query'])
+        # Run the bot in polling mode to properly handle payment callbacks;
+        # PTB stops the loop gracefully on these signals
+        app.run_polling(
+            allowed_updates=['message', 'callback_query', 'pre_checkout_query'],
+            stop_signals=(signal.SIGINT, signal.SIGTERM),
+        )
         return True
         
     except Exception as e:
@@ -7,6 +7,11 @@ import json
 from fitness_coach_bot.sheets_service import GoogleSheetsService
 import copy
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -541,8 +546,19 @@ class WorkoutManager:
                 try:
                     exercises_file = os.path.join('fitness_coach_bot', 'data', 'exercises.json')
                     os.makedirs(os.path.dirname(exercises_file), exist_ok=True)
-                    with open(exercises_file, 'w', encoding='utf-8') as f:
-                        json.dump(self.exercises_df.to_dict('records'), f, ensure_ascii=False)
+                    records = self.exercises_df.to_dict('records')
+                    if orjson is not None:
+                        payload = orjson.dumps(records, option=orjson.OPT_SERIALIZE_NUMPY)
+                    else:
+                        payload = json.dumps(records, ensure_ascii=False).encode('utf-8')
+                    # Write beside the target and rename over it, so a crash
+                    # never leaves a truncated backup behind
+                    tmp_file = f"{exercises_file}.tmp.{os.getpid()}"
+                    with open(tmp_file, 'wb') as f:
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_file, exercises_file)
                     logger.info(f"Saved exercises to local file as backup: {exercises_file}")
                 except Exception as e:
                     logger.warning(f"Could not save exercises to local file: {e}")
@@ -560,9 +576,10 @@ class WorkoutManager:
             exercises_file = os.path.join('fitness_coach_bot', 'data', 'exercises.json')
             
             if os.path.exists(exercises_file):
-                with open(exercises_file, 'r', encoding='utf-8') as f:
+                with open(exercises_file, 'rb') as f:
                     logger.info(f"Loading exercises from local file: {exercises_file}")
-                    self.exercises_df = pd.DataFrame(json.load(f))
+                    payload = f.read()
+                    self.exercises_df = pd.DataFrame(orjson.loads(payload) if orjson is not None else json.loads(payload))
                     logger.info(f"Loaded {len(self.exercises_df)} exercises from local file")
                     return
                     
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+File-storage tests for the Database snapshot + append-log persistence
+"""
+import os
+import sys
+import pytest
+
+# Add the project root to PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fitness_coach_bot import database
+from fitness_coach_bot.database import Database
+
+
+@pytest.fixture
+def open_db(tmp_path, monkeypatch):
+    """Open file-backed Database instances rooted in a temp directory"""
+    monkeypatch.setenv('USE_DYNAMO_DB', 'false')
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'fitness_coach_bot').mkdir()
+    opened = []
+
+    def _open():
+        db = Database()
+        opened.append(db)
+        return db
+
+    yield _open
+    for db in opened:
+        db.close()
+
+
+def _workout(i):
+    return {
+        'workout_id': f'workout_{i}',
+        'workout_type': 'gym',
+        'exercises_completed': i % 5,
+        'total_exercises': 5,
+        'workout_completed': i % 2 == 0,
+        'date': f'2024-01-{i % 28 + 1:02d} 10:00:00',
+    }
+
+
+def _public(records):
+    """Drop the in-memory parse caches, which are never persisted"""
+    return [{k: v for k, v in r.items() if not k.startswith('_')} for r in records]
+
+
+def _save_feedback(db, workout_id, emotional_state):
+    return db.save_workout_feedback(1, workout_id, {
+        'emotional_state': emotional_state,
+        'physical_state': 'ok',
+    })
+
+
+def test_restart_restores_users_progress_and_feedback(open_db):
+    """Everything written before close is read back identically after reopening"""
+    db = open_db()
+    db.save_user_profile(1, {'name': 'Test', 'age': 30}, telegram_handle='tester')
+    db.save_user_data(1, {'reminders_enabled': True})
+    for i in range(10):
+        db.save_workout_progress(1, _workout(i))
+    _save_feedback(db, 'workout_1', 'good')
+    _save_feedback(db, 'workout_2', 'tired')
+
+    profile = db.get_user_profile(1)
+    user_data = db.get_user_data(1)
+    progress = _public(db.get_user_progress(1))
+    feedback = db.get_user_feedback(1)
+    db.close()
+
+    reopened = open_db()
+    assert reopened.get_user_profile(1) == profile
+    assert reopened.get_user_data(1) == user_data
+    assert _public(reopened.get_user_progress(1)) == progress
+    assert reopened.get_user_feedback(1) == feedback
+
+
+def test_forced_compaction_keeps_every_progress_record_once(open_db, monkeypatch):
+    """Compacting mid-stream neither loses nor duplicates progress records"""
+    monkeypatch.setattr(database, 'WAL_COMPACT_EVERY', 7)
+    db = open_db()
+    for i in range(120):
+        db.save_workout_progress(1, _workout(i))
+    db.close()
+
+    # Compaction folded most records into the snapshot
+    with open(db._log_paths[db.progress_file], 'rb') as f:
+        assert len(f.readlines()) < 7
+
+    progress = open_db().get_user_progress(1)
+    assert [w['workout_id'] for w in progress] == [f'workout_{i}' for i in range(120)]
+
+
+def test_replay_skips_progress_already_in_snapshot(open_db):
+    """A crash between snapshot rename and log truncate doesn't duplicate progress"""
+    db = open_db()
+    for i in range(5):
+        db.save_workout_progress(1, _workout(i))
+    db.flush()
+    # Fold the log into the snapshot but leave the log in place
+    db._write_json(db.progress_file, db._read_json(db.progress_file))
+    db.close()
+
+    progress = open_db().get_user_progress(1)
+    assert [w['workout_id'] for w in progress] == [f'workout_{i}' for i in range(5)]
+
+
+def test_rerated_feedback_replays_as_last_entry(open_db):
+    """Re-rating a workout moves it to the end of the user's feedback"""
+    db = open_db()
+    _save_feedback(db, 'workout_1', 'good')
+    _save_feedback(db, 'workout_2', 'good')
+    _save_feedback(db, 'workout_1', 'tired')
+    db.close()
+
+    reopened = open_db()
+    assert list(reopened.feedback['1']) == ['workout_2', 'workout_1']
+    assert reopened.feedback['1']['workout_1']['emotional_state'] == 'tired'
+    assert next(iter(reopened.get_user_feedback(1))) == 'workout_1'